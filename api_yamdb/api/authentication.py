@@ -0,0 +1,48 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from users.cache import cache_user, get_cached, get_cached_user, set_cached
+from users.models import User
+from users.tokens import VERSION_CLAIM, user_from_claims
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, берущая пользователя из кеша.
+
+    Пользователь читается из базы только при первом запросе и после
+    изменения или удаления (см. users.cache), поэтому проверки ролей
+    сразу видят новую роль.
+
+    При AUTH_STATELESS пользователь собирается из утверждений токена,
+    выданного ClaimsAccessToken, если версия прав в токене совпадает
+    с текущей. Иначе, как и для токенов без утверждений, используется
+    пользователь из кеша или базы.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        if settings.AUTH_STATELESS and VERSION_CLAIM in validated_token:
+            if self.get_token_version(user_id) == validated_token[
+                VERSION_CLAIM
+            ]:
+                return user_from_claims(validated_token)
+        user, generation = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user, generation)
+        return user
+
+    def get_token_version(self, user_id):
+        """Текущая версия прав активного пользователя или None."""
+        version, generation = get_cached('token-version', user_id)
+        if version is None:
+            version = User.objects.filter(
+                pk=user_id, is_active=True
+            ).values_list('token_version', flat=True).first()
+            if version is not None:
+                set_cached('token-version', user_id, version, generation)
+        return version
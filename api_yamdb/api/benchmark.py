@@ -0,0 +1,344 @@
+"""
+Замеры скорости маршрутов API на синтетических данных.
+
+Каждый маршрут из api/urls.py вызывается несколько раз через
+APIClient без сетевого слоя. Для него записываются медиана и 95-й
+перцентиль времени ответа, число SQL-запросов и пиковый объём
+памяти, выделенной за запрос. Запросы, меняющие данные, выполняются
+в транзакции, которая откатывается, поэтому все повторы видят одну
+и ту же базу. Кешируемые списки замеряются дважды: как есть, то есть
+из кеша, и с очисткой кеша перед каждым запросом.
+"""
+import math
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from reviews.dataset import DATASET
+from reviews.generator import DatasetGenerator
+from reviews.importer import import_rows, rebuild_ratings
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.codes import issue_code
+from users.models import User
+from users.tokens import ClaimsAccessToken
+
+Scenario = namedtuple(
+    'Scenario', 'name route kwargs method client query data uncached',
+    defaults=({}, 'get', 'anonymous', None, None, False)
+)
+BenchmarkObjects = namedtuple(
+    'BenchmarkObjects',
+    'admin user confirmation_code title_id review_id comment_id category '
+    'genre'
+)
+
+# Маршруты, ответы которых кешируются целиком.
+CACHED_ROUTES = ('Title-list', 'categories-list', 'genres-list')
+
+# Метрики, которые сравниваются с эталоном в процентах, и рост,
+# меньше которого считается шумом измерения.
+COMPARED_METRICS = {'p50_ms': 1.0, 'p95_ms': 2.0, 'peak_kb': 16.0}
+# 95-й перцентиль по меньшему числу замеров — это почти максимум,
+# то есть один случайный выброс, поэтому он не сравнивается.
+P95_MIN_ITERATIONS = 20
+
+
+def prepare_dataset(size, seed=0):
+    """Заполняет пустую базу синтетическими данными заданного размера."""
+    generator = DatasetGenerator(size, seed=seed)
+    results = [
+        import_rows(table, generator.rows(table.name)) for table in DATASET
+    ]
+    rebuild_ratings(results)
+    return prepare_objects()
+
+
+@contextmanager
+def benchmark_database(size, seed=0):
+    """
+    Создаёт временную тестовую базу с синтетическими данными.
+
+    Рабочая база не затрагивается: после замеров тестовая база
+    удаляется и соединение возвращается к прежней. Кеш очищается,
+    чтобы в него не попали объекты из другой базы.
+    """
+    cache.clear()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield prepare_dataset(size, seed=seed)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def prepare_objects():
+    """
+    Создаёт пользователей для замеров и выбирает объекты для маршрутов.
+
+    Берётся самое популярное произведение и его отзыв с
+    комментариями: на них видны худшие случаи списков.
+    """
+    admin, _ = User.objects.get_or_create(
+        username='benchmark_admin',
+        defaults={'email': 'benchmark_admin@yamdb.fake', 'role': User.ADMIN},
+    )
+    user, _ = User.objects.get_or_create(
+        username='benchmark_user',
+        defaults={'email': 'benchmark_user@yamdb.fake'},
+    )
+    title = Title.objects.order_by('-rating_count', 'id').first()
+    comment = Comment.objects.filter(
+        review__title=title
+    ).order_by('id').first()
+    review = (
+        comment.review if comment
+        else Review.objects.filter(title=title).order_by('id').first()
+    )
+    return BenchmarkObjects(
+        admin=admin,
+        user=user,
+        confirmation_code=issue_code(user),
+        title_id=title.id,
+        review_id=review.id,
+        comment_id=comment.id if comment else None,
+        category=Category.objects.order_by('id').first().slug,
+        genre=Genre.objects.order_by('id').first().slug,
+    )
+
+
+def get_scenarios(objects):
+    title = {'title_id': objects.title_id}
+    review = {**title, 'review_id': objects.review_id}
+    scenarios = [
+        Scenario('titles', 'Title-list'),
+        Scenario('titles filter', 'Title-list', query={
+            'category': objects.category, 'genre': objects.genre,
+        }),
+        Scenario('titles search', 'Title-list', query={'search': 'звезда'}),
+        Scenario('title detail', 'Title-detail', {'pk': objects.title_id}),
+        Scenario(
+            'title create', 'Title-list', method='post', client='admin',
+            data={
+                'name': 'Замер', 'year': 2000,
+                'category': objects.category, 'genre': [objects.genre],
+            },
+        ),
+        Scenario('categories', 'categories-list'),
+        Scenario(
+            'category create', 'categories-list', method='post',
+            client='admin', data={'name': 'Замер', 'slug': 'benchmark'},
+        ),
+        Scenario(
+            'category delete', 'categories-detail',
+            {'slug': objects.category}, method='delete', client='admin',
+        ),
+        Scenario('genres', 'genres-list'),
+        Scenario(
+            'genre delete', 'genres-detail', {'slug': objects.genre},
+            method='delete', client='admin',
+        ),
+        Scenario('reviews', 'reviews-list', title),
+        Scenario(
+            'reviews expanded', 'reviews-list', title,
+            query={'expand': 'comments'},
+        ),
+        Scenario(
+            'reviews cursor', 'reviews-list', title,
+            query={'pagination': 'cursor'},
+        ),
+        Scenario(
+            'review detail', 'reviews-detail',
+            {**title, 'pk': objects.review_id},
+        ),
+        Scenario(
+            'review create', 'reviews-list', title, method='post',
+            client='user', data={'text': 'Замер', 'score': 5},
+        ),
+        Scenario('comments', 'comments-list', review),
+        Scenario(
+            'comment create', 'comments-list', review, method='post',
+            client='user', data={'text': 'Замер'},
+        ),
+        Scenario(
+            'signup', 'signup', method='post',
+            data={'username': 'benchmark_new', 'email': 'new@yamdb.fake'},
+        ),
+        Scenario(
+            'token', 'token', method='post', data={
+                'username': objects.user.username,
+                'confirmation_code': objects.confirmation_code,
+            },
+        ),
+        Scenario('users', 'users-list', client='admin'),
+        Scenario('users search', 'users-list', client='admin',
+                 query={'search': 'user1'}),
+        Scenario(
+            'user detail', 'users-detail',
+            {'username': objects.user.username}, client='admin',
+        ),
+        Scenario('users me', 'users-me', client='user'),
+        Scenario(
+            'users me update', 'users-me', method='patch', client='user',
+            data={'bio': 'Замер'},
+        ),
+        Scenario(
+            'export', 'export', {'table': 'titles'}, client='admin',
+        ),
+    ]
+    scenarios += [
+        scenario._replace(name=f'{scenario.name} uncached', uncached=True)
+        for scenario in scenarios
+        if scenario.route in CACHED_ROUTES and scenario.method == 'get'
+    ]
+    if objects.comment_id:
+        scenarios.append(Scenario(
+            'comment detail', 'comments-detail',
+            {**review, 'pk': objects.comment_id},
+        ))
+    return scenarios
+
+
+def get_clients(objects):
+    clients = {'anonymous': APIClient()}
+    for name in ('admin', 'user'):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(
+            ClaimsAccessToken.for_user(getattr(objects, name))
+        ))
+        clients[name] = client
+    return clients
+
+
+def reset_cache(scenario):
+    """Очищает кеш перед запросом сценария без кеша."""
+    if scenario.uncached:
+        cache.clear()
+
+
+def call(client, scenario):
+    """Выполняет запрос сценария и дочитывает потоковый ответ."""
+    url = reverse(f'api:{scenario.route}', kwargs=scenario.kwargs)
+    if scenario.method == 'get':
+        response = client.get(url, scenario.query)
+    else:
+        response = getattr(client, scenario.method)(
+            url, scenario.data, format='json'
+        )
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(client, scenario, iterations):
+    """Возвращает метрики одного сценария."""
+    durations = []
+    for _ in range(iterations):
+        reset_cache(scenario)
+        with transaction.atomic():
+            started = time.perf_counter()
+            response = call(client, scenario)
+            durations.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+    reset_cache(scenario)
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            call(client, scenario)
+        # Следующий запрос очистит журнал запросов соединения.
+        query_count = len(queries)
+        transaction.set_rollback(True)
+    reset_cache(scenario)
+    with transaction.atomic():
+        tracemalloc.start()
+        try:
+            call(client, scenario)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        transaction.set_rollback(True)
+    durations.sort()
+    return {
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p95_ms': round(percentile(durations, 95), 3),
+        'queries': query_count,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def run_benchmark(objects, iterations=20, warmup=2):
+    """Замеряет все сценарии на текущей базе."""
+    clients = get_clients(objects)
+    results = {}
+    for scenario in get_scenarios(objects):
+        client = clients[scenario.client]
+        for _ in range(warmup):
+            reset_cache(scenario)
+            with transaction.atomic():
+                call(client, scenario)
+                transaction.set_rollback(True)
+        results[scenario.name] = measure(client, scenario, iterations)
+    return results
+
+
+def compared_metrics(metrics):
+    if metrics.get('iterations', 0) < P95_MIN_ITERATIONS:
+        return {
+            metric: noise for metric, noise in COMPARED_METRICS.items()
+            if metric != 'p95_ms'
+        }
+    return COMPARED_METRICS
+
+
+def compare(results, baseline, threshold):
+    """
+    Сравнивает результаты с эталоном и возвращает список регрессий.
+
+    Регрессией считается другой статус ответа и любой рост числа
+    запросов. Время и память — если выросли больше чем на threshold
+    процентов и больше порога шума; p95 сравнивается, только если
+    замеров было не меньше P95_MIN_ITERATIONS.
+    Сценарии, которых нет в эталоне, не сравниваются.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, metrics in scenarios.items():
+            expected = baseline.get(size, {}).get(name)
+            if not expected:
+                continue
+            if metrics['status'] != expected.get('status', metrics['status']):
+                regressions.append(
+                    f'{size} {name}: статус {metrics["status"]} '
+                    f'вместо {expected["status"]}'
+                )
+            if metrics['queries'] > expected['queries']:
+                regressions.append(
+                    f'{size} {name}: запросов {metrics["queries"]} '
+                    f'вместо {expected["queries"]}'
+                )
+            for metric, noise in compared_metrics(metrics).items():
+                limit = max(
+                    expected[metric] * (1 + threshold / 100),
+                    expected[metric] + noise,
+                )
+                if metrics[metric] > limit:
+                    regressions.append(
+                        f'{size} {name}: {metric} {metrics[metric]} '
+                        f'вместо {expected[metric]}'
+                    )
+    return regressions
@@ -0,0 +1,99 @@
+"""Кеш ответов API, представлений объектов и валидаторы условных запросов."""
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+from api_yamdb.settings import FRAGMENT_CACHE_TIMEOUT
+from reviews.versions import get_version
+
+# Последний построенный ответ и время, когда он в последний раз
+# совпадал с актуальной версией.
+StaleResponse = namedtuple('StaleResponse', 'checked_at etag data')
+
+
+def normalized_query(query_params):
+    """Параметры запроса в постоянном порядке."""
+    return urlencode(sorted(
+        (name, value)
+        for name, values in query_params.lists()
+        for value in values
+    ))
+
+
+def request_digest(request):
+    """
+    Хеш адреса и параметров запроса.
+
+    Запросы, которые отличаются только порядком параметров, получают
+    один хеш, а длина ключа не зависит от запроса. Схема и хост входят
+    в хеш, потому что ссылки пагинации в ответе абсолютные.
+    """
+    url = '{}://{}{}?{}'.format(
+        request.scheme, request.get_host(), request.path,
+        normalized_query(request.query_params),
+    )
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+def response_cache_key(request, family):
+    """Ключ ответа на GET-запрос к ресурсу группы family."""
+    return 'api-response:{}:{}:{}'.format(
+        family, get_version(family), request_digest(request)
+    )
+
+
+def stale_response_key(request, family):
+    """Ключ последнего ответа на запрос независимо от версии группы."""
+    return f'api-response-stale:{family}:{request_digest(request)}'
+
+
+def set_stale(key, etag, data, max_age):
+    cache.set(key, StaleResponse(time.time(), etag, data), max_age)
+
+
+def run_in_background(func):
+    thread = threading.Thread(target=func, daemon=True)
+    thread.start()
+    return thread
+
+
+def make_etag(*parts):
+    """ETag из id, количеств и дат изменения с микросекундами."""
+    return '-'.join(
+        str(part.timestamp()) if isinstance(part, datetime) else str(part)
+        for part in parts
+    )
+
+
+def fragment_key(prefix, obj):
+    """Ключ представления объекта: id и дата его изменения."""
+    return f'fragment:{prefix}:{obj.pk}:{obj.modified.timestamp()}'
+
+
+def get_fragments(prefix, objects, serialize):
+    """
+    Возвращает представления objects в их порядке.
+
+    Представления берутся из кеша одним get_many, serialize получает
+    список остальных объектов и возвращает их представления, которые
+    сохраняются одним set_many. Изменение объекта меняет дату его
+    изменения, а с ней и ключ, поэтому удалять записи не нужно.
+    """
+    keys = [fragment_key(prefix, obj) for obj in objects]
+    cached = cache.get_many(keys)
+    missing = [
+        (key, obj) for key, obj in zip(keys, objects) if key not in cached
+    ]
+    if missing:
+        serialized = dict(zip(
+            (key for key, _ in missing),
+            serialize([obj for _, obj in missing]),
+        ))
+        cache.set_many(serialized, FRAGMENT_CACHE_TIMEOUT)
+        cached.update(serialized)
+    return [cached[key] for key in keys]
@@ -0,0 +1,116 @@
+"""Поля жанров и категорий, работающие через словари процесса."""
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+
+SNAPSHOTS_CONTEXT_KEY = 'dictionary_snapshots'
+
+
+def get_snapshot(field, dictionary):
+    """
+    Снимок словаря, общий для всех полей одного сериализатора.
+
+    Версия словаря сверяется с кешем один раз за сериализацию,
+    а не для каждого объекта.
+    """
+    snapshots = field.context.setdefault(SNAPSHOTS_CONTEXT_KEY, {})
+    if dictionary.family not in snapshots:
+        snapshots[dictionary.family] = dictionary.get()
+    return snapshots[dictionary.family]
+
+
+def find_entry(field, dictionary, slug=None, pk=None):
+    """
+    Запись словаря по слагу или id.
+
+    Если записи нет в снимке сериализатора, она ищется в базе,
+    а перечитанный снимок заменяет прежний.
+    """
+    snapshot = get_snapshot(field, dictionary)
+    if slug is not None:
+        entry, snapshot = dictionary.find_slug(snapshot, slug)
+    else:
+        entry, snapshot = dictionary.find_id(snapshot, pk)
+    field.context[SNAPSHOTS_CONTEXT_KEY][dictionary.family] = snapshot
+    return entry
+
+
+class DictionaryManyRelatedField(serializers.ManyRelatedField):
+    """Проверяет все слаги списка одним обращением к словарю."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.resolve(data)
+
+
+class DictionarySlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который ищет слаги в словаре процесса,
+    а не запросом к базе для каждого значения.
+    """
+
+    def __init__(self, dictionary, **kwargs):
+        self.dictionary = dictionary
+        kwargs.setdefault('slug_field', 'slug')
+        kwargs.setdefault('queryset', dictionary.model.objects.all())
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in serializers.MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return DictionaryManyRelatedField(**list_kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_representation(self, value):
+        entry = find_entry(self, self.dictionary, pk=value.pk)
+        return entry.slug if entry else None
+
+    def to_internal_value(self, data):
+        return self.resolve([data])[0]
+
+    def resolve(self, slugs):
+        instances = []
+        for slug in slugs:
+            if not isinstance(slug, str):
+                self.fail('invalid')
+            entry = find_entry(self, self.dictionary, slug=slug)
+            if entry is None:
+                self.fail(
+                    'does_not_exist', slug_name=self.slug_field,
+                    value=smart_str(slug)
+                )
+            instances.append(self.dictionary.instance(entry))
+        return instances
+
+
+class DictionaryField(serializers.Field):
+    """
+    Выводит жанр или категорию по id из словаря процесса,
+    не обращаясь к их таблицам.
+    """
+
+    def __init__(self, dictionary, many=False, **kwargs):
+        self.dictionary = dictionary
+        self.many = many
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not self.many:
+            return self.represent(value)
+        return [
+            entry for entry in map(self.represent, value) if entry is not None
+        ]
+
+    def represent(self, pk):
+        entry = find_entry(self, self.dictionary, pk=pk)
+        if entry is None:
+            return None
+        return {'name': entry.name, 'slug': entry.slug}
@@ -1,13 +1,84 @@
+from django.db import connection
+from django.db.models import Q
 from django_filters import CharFilter
 from django_filters.rest_framework import FilterSet
+from rest_framework import filters
 
+from reviews.dictionaries import category_dictionary, genre_dictionary
 from reviews.models import Title
+from reviews.search import (find_search_index, is_search_supported,
+                            normalize_search_text, search_rows,
+                            search_titles)
 
 
 class GenreCategorySlugFilter(FilterSet):
-    genre = CharFilter(field_name='genre__slug')
-    category = CharFilter(field_name='category__slug')
+    """
+    Слаги жанра и категории переводятся в id по словарям процесса,
+    поэтому таблицы жанров и категорий в запрос не попадают. Слаг,
+    которого нет в словаре, проверяется по базе.
+    """
+    genre = CharFilter(method='filter_genre')
+    category = CharFilter(method='filter_category')
 
     class Meta:
         model = Title
         fields = ['name', 'year', 'category', 'genre']
+
+    def filter_genre(self, queryset, name, value):
+        entry, _ = genre_dictionary.find_slug(genre_dictionary.get(), value)
+        if entry is None:
+            return queryset.none()
+        return queryset.filter(genre=entry.id)
+
+    def filter_category(self, queryset, name, value):
+        entry, _ = category_dictionary.find_slug(
+            category_dictionary.get(), value
+        )
+        if entry is None:
+            return queryset.none()
+        return queryset.filter(category_id=entry.id)
+
+
+class TitleSearchFilter(filters.SearchFilter):
+    """
+    Полнотекстовый поиск по названию и описанию произведения.
+
+    В SQLite использует FTS5-индекс с поиском по префиксам слов
+    и сортировкой по релевантности, в остальных СУБД — icontains.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        if is_search_supported(connection):
+            return search_titles(queryset, text)
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+
+
+class NormalizedSearchFilter(filters.SearchFilter):
+    """
+    Поиск по словам в нормализованных теневых полях.
+
+    В search_fields вьюсета указываются поля, заполненные
+    normalize_search_text. Строка поиска нормализуется так же,
+    и каждое её слово ищется как префикс слова поля: в SQLite —
+    по FTS5-индексу таблицы, в остальных СУБД — подстрокой.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        text = normalize_search_text(
+            request.query_params.get(self.search_param, '')
+        )
+        if not search_fields or not text:
+            return queryset
+        index = find_search_index(queryset.model)
+        if index is not None and is_search_supported(connection):
+            return search_rows(queryset, index, text)
+        conditions = Q()
+        for field in search_fields:
+            conditions |= Q(**{f'{field}__contains': text})
+        return queryset.filter(conditions)
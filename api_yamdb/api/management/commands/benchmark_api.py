@@ -0,0 +1,92 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from api.benchmark import (P95_MIN_ITERATIONS, benchmark_database, compare,
+                           run_benchmark)
+from reviews.generator import PRESETS
+
+BASELINE_PATH = os.path.join(settings.BASE_DIR, 'benchmark_baseline.json')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа, число запросов и память всех маршрутов '
+        'API на синтетических данных и сравнивает с эталоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', choices=list(PRESETS), default=['1k'],
+            help='Размеры данных, на которых выполняются замеры.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help='Количество замеров каждого маршрута.'
+        )
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Файл для результатов в формате JSON.'
+        )
+        parser.add_argument(
+            '--baseline', default=BASELINE_PATH,
+            help='Эталонные результаты для сравнения.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=50.0,
+            help='Допустимый рост времени и памяти в процентах.'
+        )
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Записать результаты в файл эталона.'
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        setup_test_environment(debug=False)
+        try:
+            for size in options['sizes']:
+                results[size] = self.run_size(size, options)
+        finally:
+            teardown_test_environment()
+        self.write(options['output'], results)
+        if options['update_baseline']:
+            self.write(options['baseline'], results)
+            return
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(f'Эталон {options["baseline"]} не найден.')
+            return
+        with open(options['baseline'], encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if options['iterations'] < P95_MIN_ITERATIONS:
+            self.stdout.write(
+                f'p95 не сравнивается: меньше {P95_MIN_ITERATIONS} замеров.'
+            )
+        regressions = compare(results, baseline, options['threshold'])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f'Регрессий: {len(regressions)}.')
+        self.stdout.write(self.style.SUCCESS('Регрессий не обнаружено.'))
+
+    def run_size(self, size, options):
+        with benchmark_database(
+            PRESETS[size], seed=options['seed']
+        ) as objects:
+            results = run_benchmark(objects, options['iterations'])
+        for name, metrics in results.items():
+            self.stdout.write(
+                f'{size} {name}: p50 {metrics["p50_ms"]} мс, '
+                f'p95 {metrics["p95_ms"]} мс, '
+                f'{metrics["queries"]} запросов, {metrics["peak_kb"]} КБ'
+            )
+        return results
+
+    def write(self, path, results):
+        with open(path, 'w', encoding='utf-8') as result_file:
+            json.dump(results, result_file, ensure_ascii=False, indent=2)
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from api.benchmark import benchmark_database
+from api.microbenchmark import run_microbenchmarks
+from reviews.generator import PRESETS
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет сериализаторы, разрешения и GenreCategorySlugFilter '
+        'без HTTP на синтетических данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', choices=list(PRESETS), default='10k',
+            help='Размер синтетических данных.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--objects', type=int, default=500,
+            help='Количество объектов для сериализации и проверок.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Количество повторов; в результат идёт медиана.'
+        )
+        parser.add_argument(
+            '--output', default='microbenchmark.json',
+            help='Файл для результатов в формате JSON.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        try:
+            with benchmark_database(
+                PRESETS[options['size']], seed=options['seed']
+            ):
+                results = run_microbenchmarks(
+                    options['objects'], options['repeat']
+                )
+        finally:
+            teardown_test_environment()
+        for name, metrics in results.items():
+            self.stdout.write(f'{name}: ' + ', '.join(
+                f'{metric} {value}' for metric, value in metrics.items()
+            ))
+        with open(options['output'], 'w', encoding='utf-8') as result_file:
+            json.dump(results, result_file, ensure_ascii=False, indent=2)
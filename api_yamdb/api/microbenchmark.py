@@ -0,0 +1,179 @@
+"""
+Микробенчмарки сериализаторов, разрешений и фильтров без HTTP.
+
+Для сериализаторов время разбито на этапы: выборка из базы (orm),
+построение полей сериализатора (fields), преобразование объектов
+в словари (serialize) и рендеринг JSON (render). Так видно, уходит
+ли время в ORM, в интроспекцию полей DRF или в вывод.
+"""
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api_yamdb.settings import EXPANDED_COMMENTS_LIMIT
+from reviews.models import Comment, Review, Title, attach_first_comments
+from users.models import User
+from .filters import GenreCategorySlugFilter
+from .permissions import (IsAdminOrModeratorOrOwnerOrReadOnly,
+                          IsAdminOrReadOnly, IsSuperUserOrIsAdmin)
+from .serializers import (CommentSerializer, ReviewSerializer,
+                          TitleGetSerializer, UserSerializer)
+
+PERMISSIONS = (
+    IsAdminOrModeratorOrOwnerOrReadOnly,
+    IsAdminOrReadOnly,
+    IsSuperUserOrIsAdmin,
+)
+
+
+def serializer_cases():
+    """Сериализаторы с теми же выборками, что и во вьюсетах."""
+    reviews = Review.objects.select_related('author').with_comments_count()
+    return (
+        (
+            'TitleGetSerializer', TitleGetSerializer,
+            Title.objects.with_genre_links().order_by('id'),
+            {},
+        ),
+        ('ReviewSerializer', ReviewSerializer, reviews.order_by('id'), {}),
+        (
+            'ReviewSerializer expanded', ReviewSerializer,
+            reviews.order_by('id'),
+            {'expand_comments': True},
+        ),
+        (
+            'CommentSerializer', CommentSerializer,
+            Comment.objects.select_related('author').order_by('id'), {},
+        ),
+        ('UserSerializer', UserSerializer, User.objects.order_by('id'), {}),
+    )
+
+
+def median_ms(func, repeat):
+    """Медиана времени вызова в миллисекундах и последний результат."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations), result
+
+
+def fetch(queryset, context):
+    """Выбирает объекты так же, как вьюсет выбирает страницу."""
+    instances = list(queryset)
+    if context.get('expand_comments'):
+        attach_first_comments(instances, EXPANDED_COMMENTS_LIMIT)
+    return instances
+
+
+def bench_serializer(serializer_class, queryset, context, objects, repeat):
+    queryset = queryset[:objects]
+    orm_ms, instances = median_ms(
+        lambda: fetch(queryset.all(), context), repeat
+    )
+    fields_ms, _ = median_ms(
+        lambda: serializer_class(context=context).fields, repeat
+    )
+    serialize_ms, data = median_ms(
+        lambda: serializer_class(instances, many=True, context=context).data,
+        repeat,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        serializer_class(instances, many=True, context=context).data
+    render_ms, _ = median_ms(lambda: JSONRenderer().render(data), repeat)
+    return {
+        'objects': len(instances),
+        'orm_ms': round(orm_ms, 3),
+        'fields_ms': round(fields_ms, 3),
+        'serialize_ms': round(serialize_ms, 3),
+        'render_ms': round(render_ms, 3),
+        'serialize_queries': len(queries),
+        'per_object_us': round(
+            serialize_ms * 1000 / max(len(instances), 1), 2
+        ),
+    }
+
+
+def permission_requests(users):
+    """Запросы всех безопасных и изменяющих методов от каждой роли."""
+    factory = APIRequestFactory()
+    requests = []
+    for user in users:
+        for method in ('get', 'post', 'patch', 'delete'):
+            request = Request(getattr(factory, method)('/'))
+            request.user = user
+            requests.append(request)
+    return requests
+
+
+def bench_permission(permission_class, requests, obj, calls, repeat):
+    permission = permission_class()
+
+    def check_all():
+        for _ in range(calls):
+            for request in requests:
+                permission.has_permission(request, None)
+                permission.has_object_permission(request, None, obj)
+
+    total_ms, _ = median_ms(check_all, repeat)
+    checks = calls * len(requests)
+    return {
+        'checks': checks,
+        'total_ms': round(total_ms, 3),
+        'per_check_us': round(total_ms * 1000 / checks, 3),
+    }
+
+
+def bench_filterset(data, calls, repeat):
+    """Создание фильтра и построение выборки без обращения к базе."""
+    queryset = Title.objects.all()
+
+    def build():
+        for _ in range(calls):
+            str(GenreCategorySlugFilter(data=data, queryset=queryset).qs.query)
+
+    total_ms, _ = median_ms(build, repeat)
+    return {
+        'filtersets': calls,
+        'total_ms': round(total_ms, 3),
+        'per_filterset_us': round(total_ms * 1000 / calls, 2),
+    }
+
+
+def run_microbenchmarks(objects=500, repeat=5):
+    """Замеряет сериализаторы, разрешения и фильтр на текущей базе."""
+    results = {}
+    for name, serializer_class, queryset, context in serializer_cases():
+        results[name] = bench_serializer(
+            serializer_class, queryset, context, objects, repeat
+        )
+    review = Review.objects.select_related('author').order_by('id').first()
+    users = [
+        User(username='admin', role=User.ADMIN),
+        User(username='moderator', role=User.MODERATOR),
+        User(username='user', role=User.USER),
+        review.author,
+    ]
+    requests = permission_requests(users)
+    for permission_class in PERMISSIONS:
+        results[permission_class.__name__] = bench_permission(
+            permission_class, requests, review, objects, repeat
+        )
+    title = Title.objects.select_related('category').order_by('id').first()
+    genre = title.genre.first()
+    results['GenreCategorySlugFilter'] = bench_filterset(
+        {
+            'category': title.category.slug,
+            'genre': genre.slug if genre else '',
+            'year': title.year,
+        },
+        objects,
+        repeat,
+    )
+    return results
@@ -1,14 +1,263 @@
+import hashlib
+import time
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.db.models import prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import filters, mixins, viewsets
+from rest_framework.response import Response
 
+from api_yamdb.settings import RESPONSE_CACHE_TIMEOUT
+from .cache import (get_fragments, make_etag, response_cache_key,
+                    run_in_background, set_stale, stale_response_key)
+from .filters import NormalizedSearchFilter
 from .permissions import IsAdminOrReadOnly
 
+# Фоновый пересчёт ответа: сколько секунд держится блокировка,
+# сколько делается попыток и пауза перед второй (дальше удваивается).
+REFRESH_LOCK_TIMEOUT = 30
+REFRESH_ATTEMPTS = 4
+REFRESH_RETRY_DELAY = 0.5
+
+
+def not_modified(request, etag, modified=None):
+    """Ответ 304, если клиент прислал совпадающие валидаторы."""
+    return get_conditional_response(
+        request, etag=etag,
+        last_modified=int(modified.timestamp()) if modified else None,
+    )
+
+
+def set_validators(response, etag, modified=None):
+    response['ETag'] = etag
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified.timestamp())
+    return response
+
+
+def stale_response(stale):
+    response = Response(stale.data, headers={
+        'X-Cache': 'STALE',
+        'Age': str(int(time.time() - stale.checked_at)),
+    })
+    return set_validators(response, stale.etag)
+
+
+class CachedListMixin:
+    """
+    Кеширует данные ответов list по версии группы cache_family.
+
+    Ответ не зависит от пользователя, поэтому один кеш общий для всех.
+    Заголовок X-Cache показывает, взят ли ответ из кеша. ETag — версия
+    группы и параметры запроса, поэтому ответ 304 не требует даже
+    чтения из кеша.
+
+    При RESPONSE_STALE_WHILE_REVALIDATE последний ответ хранится и
+    без версии. Если база занята или ответ уже пересчитывается другим
+    запросом, отдаётся он с X-Cache: STALE и возрастом в заголовке
+    Age, а ответ пересчитывается в фоне одним потоком. Если из-за
+    занятой базы не удаётся прочитать пользователя, список отдаётся
+    как анонимному: от пользователя он не зависит.
+    """
+    cache_family = None
+
+    def perform_authentication(self, request):
+        try:
+            super().perform_authentication(request)
+        except OperationalError:
+            if not (
+                settings.RESPONSE_STALE_WHILE_REVALIDATE
+                and self.action == 'list'
+            ):
+                raise
+            request.user, request.auth = AnonymousUser(), None
+
+    def list(self, request, *args, **kwargs):
+        key = response_cache_key(request, self.cache_family)
+        etag = quote_etag(key.split(':', 2)[2])
+        response = not_modified(request, etag)
+        if response is not None:
+            return set_validators(response, etag)
+        if settings.RESPONSE_STALE_WHILE_REVALIDATE:
+            return self.stale_while_revalidate(
+                key, etag, request, *args, **kwargs
+            )
+        data = cache.get(key)
+        if data is not None:
+            return set_validators(
+                Response(data, headers={'X-Cache': 'HIT'}), etag
+            )
+        return set_validators(
+            self.fresh_list(key, None, request, *args, **kwargs), etag
+        )
+
+    def fresh_list(self, key, stale_key, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT)
+        if stale_key:
+            set_stale(
+                stale_key, quote_etag(key.split(':', 2)[2]), response.data,
+                settings.RESPONSE_STALE_MAX_AGE,
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def stale_while_revalidate(self, key, etag, request, *args, **kwargs):
+        stale_key = stale_response_key(request, self.cache_family)
+        max_age = settings.RESPONSE_STALE_MAX_AGE
+        cached = cache.get_many([key, stale_key])
+        stale = cached.get(stale_key)
+        if key in cached:
+            # Ответ ещё актуален: продлеваем срок, в течение которого
+            # его можно отдавать устаревшим.
+            if (
+                stale is None or stale.etag != etag
+                or time.time() - stale.checked_at > max_age / 2
+            ):
+                set_stale(stale_key, etag, cached[key], max_age)
+            return set_validators(
+                Response(cached[key], headers={'X-Cache': 'HIT'}), etag
+            )
+        if stale is not None and time.time() - stale.checked_at > max_age:
+            stale = None
+        if stale is None:
+            return set_validators(
+                self.fresh_list(key, stale_key, request, *args, **kwargs),
+                etag,
+            )
+        lock_key = f'{stale_key}:refresh'
+        if not cache.add(lock_key, True, REFRESH_LOCK_TIMEOUT):
+            # Ответ уже пересчитывается: база занята или медленная.
+            return stale_response(stale)
+        refreshing = False
+        try:
+            return set_validators(
+                self.fresh_list(key, stale_key, request, *args, **kwargs),
+                etag,
+            )
+        except OperationalError:
+            refreshing = True
+            run_in_background(partial(
+                self.refresh, lock_key, key, stale_key, request,
+                *args, **kwargs
+            ))
+            return stale_response(stale)
+        finally:
+            if not refreshing:
+                cache.delete(lock_key)
+
+    def refresh(self, lock_key, key, stale_key, request, *args, **kwargs):
+        """Пересчитывает ответ в фоне, пока база не освободится."""
+        try:
+            for attempt in range(REFRESH_ATTEMPTS):
+                try:
+                    self.fresh_list(key, stale_key, request, *args, **kwargs)
+                    return
+                except OperationalError:
+                    time.sleep(REFRESH_RETRY_DELAY * 2 ** attempt)
+        finally:
+            cache.delete(lock_key)
+            connections.close_all()
+
+
+class ConditionalRetrieveMixin:
+    """
+    Отвечает 304 на условный GET-запрос к объекту.
+
+    Валидаторы строятся по get_object_validators загруженного объекта,
+    поэтому сериализатор для ответа 304 не вызывается.
+    """
+
+    def get_object_validators(self, obj):
+        return obj.pk, obj.modified
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = quote_etag(make_etag(*self.get_object_validators(instance)))
+        response = not_modified(request, etag, instance.modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return set_validators(response, etag, instance.modified)
+
+
+class ConditionalListMixin(ConditionalRetrieveMixin):
+    """
+    Отвечает 304 на условный GET-запрос к списку.
+
+    ETag строится по валидаторам объектов страницы и ссылкам
+    пагинации. Last-Modified не передаётся: удаление объекта не
+    меняет даты изменения оставшихся.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = list(queryset) if page is None else page
+        parts = [
+            part for obj in objects
+            for part in self.get_object_validators(obj)
+        ]
+        if page is not None:
+            envelope = self.get_paginated_response([]).data
+            parts += [
+                value for name, value in envelope.items()
+                if name != 'results'
+            ]
+        etag = quote_etag(hashlib.md5(
+            make_etag(*parts).encode()
+        ).hexdigest())
+        response = not_modified(request, etag)
+        if response is None:
+            data = self.get_serializer(objects, many=True).data
+            response = (
+                Response(data) if page is None
+                else self.get_paginated_response(data)
+            )
+        return set_validators(response, etag)
+
+
+class FragmentListMixin:
+    """
+    Собирает ответы list из закешированных представлений объектов.
+
+    Страница выбирается без prefetch_related: связанные объекты
+    из fragment_prefetch загружаются и сериализуются только для
+    объектов, чьих представлений нет в кеше.
+    """
+    fragment_prefix = None
+    fragment_prefetch = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(
+            self.get_queryset()
+        ).prefetch_related(None)
+        page = self.paginate_queryset(queryset)
+        data = get_fragments(
+            self.fragment_prefix,
+            list(queryset) if page is None else page,
+            self.serialize_fragments,
+        )
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def serialize_fragments(self, instances):
+        prefetch_related_objects(instances, *self.fragment_prefetch)
+        return self.get_serializer(instances, many=True).data
+
 
-class CreateListDestroyViewSet(mixins.CreateModelMixin,
+class CreateListDestroyViewSet(CachedListMixin,
+                               mixins.CreateModelMixin,
                                mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     lookup_field = 'slug'
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (filters.SearchFilter, filters.OrderingFilter)
-    search_fields = ('name',)
+    filter_backends = (NormalizedSearchFilter, filters.OrderingFilter)
+    search_fields = ('name_search',)
     ordering = ('id',)
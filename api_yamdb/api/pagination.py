@@ -0,0 +1,62 @@
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Пагинация по ключу: следующая страница выбирается условием id > курсор.
+
+    Не выполняет COUNT(*) и OFFSET, поэтому стоимость страницы
+    не зависит от её номера.
+    """
+
+    ordering = 'id'
+
+
+class PageNumberOrCursorPagination(BasePagination):
+    """
+    Постраничная пагинация с переключением на пагинацию по ключу.
+
+    По умолчанию ответ совпадает с PageNumberPagination. Параметр
+    `pagination=cursor` или переданный курсор включают IdCursorPagination
+    с непрозрачными ссылками next/previous и без поля count.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    page_number_class = PageNumberPagination
+    cursor_class = IdCursorPagination
+
+    def get_delegate(self, request):
+        cursor = self.cursor_class()
+        if (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or cursor.cursor_query_param in request.query_params
+        ):
+            return cursor
+        return self.page_number_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.delegate = self.get_delegate(request)
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def to_html(self):
+        return self.delegate.to_html()
+
+    def get_results(self, data):
+        return self.delegate.get_results(data)
+
+    def get_schema_fields(self, view):
+        return (
+            self.page_number_class().get_schema_fields(view)
+            + self.cursor_class().get_schema_fields(view)
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number_class().get_schema_operation_parameters(view)
+            + self.cursor_class().get_schema_operation_parameters(view)
+        )
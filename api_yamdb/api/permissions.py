@@ -12,7 +12,7 @@ class IsAdminOrModeratorOrOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user == obj.author
+            or request.user.id == obj.author_id
             or request.user.is_admin
             or request.user.is_moderator
         )
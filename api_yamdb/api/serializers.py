@@ -1,16 +1,22 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from api_yamdb.settings import FORBIDDEN_SYMBOL
+from reviews.dictionaries import category_dictionary, genre_dictionary
+from reviews.exporter import EXPORT_FORMATS
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
+from .fields import DictionaryField, DictionarySlugRelatedField
 
 
 class GenreSerializer(serializers.ModelSerializer):
 
     class Meta:
+        fields = ('name', 'slug')
         model = Genre
-        exclude = ('id',)
         lookup_field = 'slug'
 
 
@@ -23,15 +29,8 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class TitleSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Category.objects.all()
-    )
-    genre = serializers.SlugRelatedField(
-        many=True,
-        slug_field='slug',
-        queryset=Genre.objects.all()
-    )
+    category = DictionarySlugRelatedField(category_dictionary)
+    genre = DictionarySlugRelatedField(genre_dictionary, many=True)
 
     class Meta:
         fields = ('id', 'name', 'year', 'category', 'genre', 'description')
@@ -44,8 +43,8 @@ class TitleSerializer(serializers.ModelSerializer):
 
 
 class TitleGetSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(read_only=True)
-    genre = GenreSerializer(many=True, read_only=True)
+    category = DictionaryField(category_dictionary, source='category_id')
+    genre = DictionaryField(genre_dictionary, many=True, source='genre_ids')
     rating = serializers.IntegerField(
         read_only=True,
     )
@@ -63,39 +62,56 @@ class TitleGetSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
-        slug_field='username',
         read_only=True,
-        default=serializers.CurrentUserDefault()
+        slug_field='username',
     )
-
-    def validate(self, data):
-        request = self.context.get('request')
-        title = self.context['view'].kwargs.get('title_id')
-        author = self.context['request'].user
-        if (
-            request.method == 'POST' and Review.objects.filter(
-                title=title, author=author).exists()):
-            raise serializers.ValidationError(
-                'Ваш отзыв на это произведение уже опубликован')
-        return data
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date', 'comments')
-        model = Review
+        fields = ('id', 'text', 'author', 'pub_date', 'review')
+        model = Comment
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
-        read_only=True,
         slug_field='username',
+        read_only=True,
+        default=serializers.CurrentUserDefault()
     )
-    review = serializers.PrimaryKeyRelatedField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    comments = CommentSerializer(
+        many=True, read_only=True, source='expanded_comments'
+    )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('expand_comments'):
+            fields.pop('comments')
+        return fields
+
+    def create(self, validated_data):
+        """
+        Повторный отзыв отклоняет ограничение unique_author_title,
+        поэтому отдельный запрос на проверку не нужен. Review.save
+        сам выполняется в транзакции и откатывает её при ошибке.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Ваш отзыв на это произведение уже опубликован'
+                ]
+            })
 
     class Meta:
-        fields = ('id', 'text', 'author', 'pub_date', 'review')
-        model = Comment
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comments_count',
+            'comments'
+        )
+        model = Review
 
 
 class BaseUser(serializers.ModelSerializer):
@@ -117,21 +133,58 @@ class UserCreateSerializer(BaseUser):
     email = serializers.EmailField(max_length=254)
 
     def validate(self, data):
-        """Проверка уже зарегестрированных пользователей."""
-        email_exists = User.objects.filter(email=data.get('email')).exists()
-        username_exists = User.objects.filter(
-            username=data.get('username')
-        ).exists()
-        if email_exists and not username_exists:
-            raise serializers.ValidationError(
-                'Пользователь с этой почтой уже существует!'
-            )
-        if username_exists and not email_exists:
-            raise serializers.ValidationError(
-                'Пользователь с таким логином уже существует!'
-            )
+        """
+        Проверка уже зарегестрированных пользователей.
+
+        Повторная регистрация с теми же username и email допустима,
+        найденный пользователь сохраняется в existing_user.
+        """
+        self.existing_user = self.find_user(data['username'], data['email'])
         return data
 
+    def find_user(self, username, email):
+        """
+        Одним запросом находит пользователя с этими username и email.
+
+        Возвращает None, если таких нет, и вызывает ValidationError,
+        если username или email заняты другим пользователем.
+        """
+        matches = list(User.objects.filter(
+            Q(username=username) | Q(email=email)
+        )[:2])
+        for user in matches:
+            if user.username == username and user.email == email:
+                return user
+        errors = []
+        if any(user.email == email for user in matches):
+            errors.append('Пользователь с этой почтой уже существует!')
+        if any(user.username == username for user in matches):
+            errors.append('Пользователь с таким логином уже существует!')
+        if errors:
+            raise serializers.ValidationError(errors)
+        return None
+
+    def create(self, validated_data):
+        """
+        Возвращает найденного при проверке пользователя или создаёт нового.
+
+        Если параллельная регистрация успела занять username или email,
+        уникальные ограничения базы вызовут IntegrityError, и результат
+        определяется повторным поиском.
+        """
+        if self.existing_user:
+            return self.existing_user
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            user = self.find_user(
+                validated_data['username'], validated_data['email']
+            )
+            if user is None:
+                raise
+            return user
+
     class Meta:
         model = User
         fields = ('username', 'email')
@@ -160,3 +213,13 @@ class UserSerializer(BaseUser):
         fields = (
             'username', 'email', 'first_name', 'last_name', 'bio', 'role'
         )
+
+
+class DatasetExportSerializer(serializers.Serializer):
+    """Параметры потоковой выгрузки таблицы."""
+
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default='csv')
+    gzip = serializers.BooleanField(default=False)
+    category = serializers.SlugField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
@@ -1,9 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserCreateViewSet,
-                    UserReceiveTokenViewSet, UserViewSet)
+from .views import (CategoryViewSet, CommentViewSet, DatasetExportView,
+                    GenreViewSet, ReviewViewSet, TitleViewSet,
+                    UserCreateViewSet, UserReceiveTokenViewSet, UserViewSet)
 
 app_name = 'api'
 
@@ -40,4 +40,5 @@ auth_urls_v1 = [
 urlpatterns = [
     path('', include(router_v1.urls)),
     path('auth/', include(auth_urls_v1)),
+    path('export/<str:table>/', DatasetExportView.as_view(), name='export'),
 ]
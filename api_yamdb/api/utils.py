@@ -1,14 +1,15 @@
-from django.core.mail import send_mail
+from users.outbox import queue_email
 
-from api_yamdb.settings import EMAIl_ADRESS
 
+def queue_confirmation_code(email, confirmation_code):
+    """
+    Ставит в очередь письмо с кодом подтверждения.
 
-def send_confirmation_code(email, confirmation_code):
-    """Oтправляет на почту пользователя код подтверждения."""
-    send_mail(
+    Письмо отправляет команда send_emails, поэтому регистрация
+    не зависит от доступности почтового сервера.
+    """
+    queue_email(
+        email=email,
         subject='Код подтверждения',
         message=f'Ваш код подтверждения: {confirmation_code}',
-        from_email=EMAIl_ADRESS,
-        recipient_list=(email,),
-        fail_silently=False,
     )
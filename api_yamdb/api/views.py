@@ -1,38 +1,52 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.exceptions import MethodNotAllowed, NotFound
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-
-from reviews.models import Category, Genre, Review, Title
+from rest_framework.views import APIView
+
+from api_yamdb.settings import EXPANDED_COMMENTS_LIMIT
+from reviews.dataset import DATASET_TABLES
+from reviews.exporter import export_filename, iter_export
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            attach_first_comments, genre_links)
+from reviews.versions import CATEGORIES, GENRES, TITLES
+from users.codes import issue_code, verify_code
 from users.models import User
-from .filters import GenreCategorySlugFilter
-from .mixins import CreateListDestroyViewSet
+from users.tokens import ClaimsAccessToken
+from .filters import (GenreCategorySlugFilter, NormalizedSearchFilter,
+                      TitleSearchFilter)
+from .mixins import (CachedListMixin, ConditionalListMixin,
+                     ConditionalRetrieveMixin, CreateListDestroyViewSet,
+                     FragmentListMixin)
+from .pagination import PageNumberOrCursorPagination
 from .permissions import (IsAdminOrModeratorOrOwnerOrReadOnly,
                           IsAdminOrReadOnly, IsSuperUserOrIsAdmin)
 from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, ReviewSerializer,
-                          TitleGetSerializer, TitleSerializer,
-                          UserCreateSerializer, UserRecieveTokenSerializer,
-                          UserSerializer)
-from .utils import send_confirmation_code
+                          DatasetExportSerializer, GenreSerializer,
+                          ReviewSerializer, TitleGetSerializer,
+                          TitleSerializer, UserCreateSerializer,
+                          UserRecieveTokenSerializer, UserSerializer)
+from .utils import queue_confirmation_code
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.order_by('id').annotate(
-        rating=Avg('reviews__score')
-    )
+class TitleViewSet(CachedListMixin, FragmentListMixin,
+                   ConditionalRetrieveMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.with_genre_links().order_by('id')
     serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
     http_method_names = ['get', 'post', 'patch', 'delete']
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter,)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = GenreCategorySlugFilter
+    cache_family = TITLES
+    fragment_prefix = 'title'
+    fragment_prefetch = (genre_links(),)
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
@@ -43,52 +57,123 @@ class TitleViewSet(viewsets.ModelViewSet):
 class CategoryViewSet(CreateListDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_family = CATEGORIES
 
 
 class GenreViewSet(CreateListDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_family = GENRES
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly,
                           IsAdminOrModeratorOrOwnerOrReadOnly]
+    pagination_class = PageNumberOrCursorPagination
     http_method_names = ['get', 'post', 'delete', 'patch']
 
+    @property
+    def expand_comments(self):
+        expand = self.request.query_params.get('expand', '')
+        return 'comments' in expand.split(',')
+
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get("title_id"))
+        """Возвращает произведение из URL, запрашивая его один раз."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author').with_comments_count()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and self.expand_comments:
+            attach_first_comments(page, EXPANDED_COMMENTS_LIMIT)
+        return page
+
+    def get_object(self):
+        review = super().get_object()
+        if self.expand_comments:
+            attach_first_comments([review], EXPANDED_COMMENTS_LIMIT)
+        return review
+
+    def list(self, request, *args, **kwargs):
+        self.get_title()
+        return super().list(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand_comments'] = self.expand_comments
+        return context
+
+    def get_object_validators(self, review):
+        # Новый или изменённый комментарий обновляет дату изменения
+        # отзыва, удалённый — уменьшает число комментариев.
+        return review.pk, review.modified, review.comments_count
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        review = serializer.save(
+            author=self.request.user, title=self.get_title()
+        )
+        review.comments_count = 0
+        review.expanded_comments = []
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly,
                           IsAdminOrModeratorOrOwnerOrReadOnly]
+    pagination_class = PageNumberOrCursorPagination
     http_method_names = ['get', 'post', 'delete', 'patch']
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        """
+        Возвращает отзыв из URL, запрашивая его один раз.
+
+        Отзыв ищется вместе с произведением, поэтому отзыв
+        к другому произведению даёт ответ 404.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author')
+
+    def list(self, request, *args, **kwargs):
+        self.get_review()
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        Review.objects.filter(pk=instance.review_id).update(
+            modified=timezone.now()
+        )
+
 
 class UserCreateViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     """
     Вьюсет для создания новых пользователей.
 
     Разрешает доступ всем пользователям для регистрации.
-    После успешного создания пользователя отправляет на его
-    email код подтверждения.
+    После успешного создания пользователя ставит в очередь
+    письмо с кодом подтверждения.
     """
 
     permission_classes = (permissions.AllowAny,)
@@ -99,22 +184,21 @@ class UserCreateViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
         Обрабатывает запрос на создание пользователя.
 
         Если пользователь с таким же именем пользователя и email
-        уже существует, обновляет его данные.
-        В любом случае отправляет код подтверждения
-        на email пользователя.
+        уже существует, повторно отправляет ему код.
+        Ставит в очередь письмо с новым кодом подтверждения в той же
+        транзакции, если предыдущий код не был выдан только что.
 
         Возвращает JSON-ответ с данными пользователя и статусом 200 (OK).
         """
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user, _ = User.objects.get_or_create(
-            username=serializer.validated_data['username'],
-            email=serializer.validated_data['email'],
-        )
-        confirmation_code = default_token_generator.make_token(user)
-        send_confirmation_code(
-            email=user.email, confirmation_code=confirmation_code
-        )
+        with transaction.atomic():
+            user = serializer.save()
+            confirmation_code = issue_code(user)
+            if confirmation_code:
+                queue_confirmation_code(
+                    email=user.email, confirmation_code=confirmation_code
+                )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -143,12 +227,14 @@ class UserReceiveTokenViewSet(mixins.CreateModelMixin,
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
         confirmation_code = serializer.validated_data.get('confirmation_code')
-        user = get_object_or_404(User, username=username)
-
-        if not default_token_generator.check_token(user, confirmation_code):
+        user = get_object_or_404(
+            User.objects.select_related('confirmation_code'),
+            username=username,
+        )
+        if not verify_code(user, confirmation_code):
             message = {'confirmation_code': 'Неверный код подтверждения'}
             return Response(message, status=status.HTTP_400_BAD_REQUEST)
-        message = {'token': str(AccessToken.for_user(user))}
+        message = {'token': str(ClaimsAccessToken.for_user(user))}
         return Response(message, status=status.HTTP_200_OK)
 
 
@@ -166,8 +252,9 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsSuperUserOrIsAdmin,)
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('username',)
+    pagination_class = PageNumberOrCursorPagination
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('username_search',)
     lookup_field = 'username'
 
     def update(self, *args, **kwargs):
@@ -203,15 +290,63 @@ class UserViewSet(viewsets.ModelViewSet):
         но не изменяет его роль.
         Возвращает данные пользователя и статус 200 (OK).
         """
+        user = request.user
+        if getattr(user, 'from_token_claims', False):
+            # В пользователе из токена есть только поля для проверки прав.
+            user = User.objects.get(pk=user.pk)
         if request.method == 'PATCH':
             serializer = self.serializer_class(
-                request.user,
+                user,
                 data=request.data,
                 partial=True,
                 context={'request': request},
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = self.serializer_class(request.user)
+        serializer = self.serializer_class(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class DatasetExportView(APIView):
+    """
+    Потоковая выгрузка таблицы в формате static/data или JSON Lines.
+
+    Доступна только администраторам и суперпользователям.
+    Строки читаются из базы порциями и сразу отдаются клиенту,
+    поэтому память не зависит от размера таблицы.
+    """
+
+    permission_classes = (IsSuperUserOrIsAdmin,)
+
+    def get(self, request, table):
+        if table not in DATASET_TABLES:
+            raise NotFound(f'Таблица {table} не найдена.')
+        dataset_table = DATASET_TABLES[table]
+        serializer = DatasetExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        content_type = (
+            'text/csv' if params['output'] == 'csv'
+            else 'application/x-ndjson'
+        )
+        response = StreamingHttpResponse(
+            iter_export(
+                dataset_table,
+                export_format=params['output'],
+                compress=params['gzip'],
+                category=params.get('category'),
+                date_from=params.get('date_from'),
+                date_to=params.get('date_to'),
+            ),
+            content_type=(
+                'application/gzip' if params['gzip'] else content_type
+            ),
+        )
+        filename = export_filename(
+            dataset_table, params['output'], params['gzip']
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+        return response
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -71,6 +72,32 @@ DATABASES = {
 }
 
 
+# Кеш выбирается переменной окружения CACHE_BACKEND: locmem — память
+# процесса, file — каталог на диске, database — таблица в базе, общая
+# для всех процессов (создаётся командой createcachetable).
+# Версии кеша ответов меняются в кеше процесса, сохранившего изменение,
+# поэтому locmem подходит только для сервера из одного процесса:
+# остальные процессы отдают старые ответы до RESPONSE_CACHE_TIMEOUT.
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', BASE_DIR / 'cache'),
+    },
+    'database': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'api_yamdb_cache'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -115,7 +142,7 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -131,6 +158,63 @@ SIMPLE_JWT = {
 
 EMAIl_ADRESS = 'test@mail.com'
 
+# Очередь писем: размер пакета, число попыток, начальная задержка
+# повтора (удваивается с каждой попыткой) и срок, после которого
+# отправленные и отменённые письма удаляются.
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = timedelta(minutes=1)
+EMAIL_OUTBOX_RETENTION = timedelta(days=7)
+
+# Коды подтверждения: длина, срок действия, число неверных попыток,
+# после которого код перестаёт приниматься, и интервал, в течение
+# которого новый код (а с ним и письмо) не выдаётся.
+CONFIRMATION_CODE_LENGTH = 8
+CONFIRMATION_CODE_TTL = timedelta(hours=1)
+CONFIRMATION_CODE_MAX_ATTEMPTS = 5
+CONFIRMATION_CODE_COOLDOWN = timedelta(minutes=1)
+
 FORBIDDEN_SYMBOL = r'^[\w.@+-]+$'
 
 AUTH_USER_MODEL = 'users.User'
+
+EXPANDED_COMMENTS_LIMIT = 3
+
+# Кешировать аутентифицированных пользователей и версии их прав.
+# Поколение пользователя меняется только в кеше процесса, который
+# сохранил изменение, поэтому в locmem (у каждого процесса свой кеш)
+# остальные процессы ещё AUTH_USER_CACHE_TIMEOUT секунд видели бы
+# старую роль; для него кеш по умолчанию выключен.
+AUTH_USER_CACHE = (
+    CACHES['default']['BACKEND'] != CACHE_BACKENDS['locmem']['BACKEND']
+)
+
+# Сколько секунд аутентифицированный пользователь хранится в кеше.
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Брать роль пользователя из утверждений токена без чтения из базы
+# (версия прав при этом сверяется через кеш, а без AUTH_USER_CACHE —
+# по базе).
+AUTH_STATELESS = False
+
+# Сколько секунд хранятся ответы списков произведений, категорий
+# и жанров; изменения данных делают их недействительными раньше.
+RESPONSE_CACHE_TIMEOUT = 600
+
+# Сколько секунд хранятся представления отдельных произведений, из
+# которых собираются списки. В ключ входит дата изменения, поэтому
+# устаревшие представления не используются.
+FRAGMENT_CACHE_TIMEOUT = 3600
+
+# Сколько секунд словари жанров и категорий процесса используются без
+# перечитывания таблиц. Версия в кеше locmem меняется только в
+# процессе, сохранившем изменение, поэтому остальные процессы узнают
+# о нём не позже этого срока.
+DICTIONARY_MAX_AGE = 30
+
+# Отдавать последний ответ списков произведений, категорий и жанров,
+# пока база занята или ответ пересчитывается в фоне. Ответ отдаётся,
+# только если он совпадал с актуальным не дольше
+# RESPONSE_STALE_MAX_AGE секунд назад.
+RESPONSE_STALE_WHILE_REVALIDATE = False
+RESPONSE_STALE_MAX_AGE = 60
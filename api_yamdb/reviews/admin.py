@@ -1,7 +1,29 @@
 from django.contrib import admin
 
-from reviews.models import Category, Genre, Title
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.signals import touch_titles
+from reviews.versions import TITLES, bump_versions
 
 admin.site.register(Category)
 admin.site.register(Genre)
-admin.site.register(Title)
+
+
+class GenreTitleInline(admin.TabularInline):
+    model = GenreTitle
+    extra = 1
+
+
+@admin.register(Title)
+class TitleAdmin(admin.ModelAdmin):
+    """
+    Жанры произведения редактируются строками GenreTitle: поле
+    с промежуточной моделью ModelAdmin в форму не выводит.
+    """
+
+    inlines = (GenreTitleInline,)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Строки GenreTitle сохраняются без m2m_changed.
+        touch_titles(pk=form.instance.pk)
+        bump_versions(TITLES)
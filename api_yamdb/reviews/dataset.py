@@ -0,0 +1,199 @@
+"""Формат выгрузки static/data/*.csv и преобразование её строк."""
+import csv
+import hashlib
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import models
+from django.utils.dateparse import parse_date, parse_datetime
+
+from users.models import User
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .search import normalize_search_text
+
+
+class DatasetTable:
+    """
+    Описание одного CSV-файла выгрузки.
+
+    columns сопоставляет колонки файла с полями модели в том
+    порядке, в котором колонки записываются при экспорте.
+    derived_fields — поля, которые заполняет prepare и которые
+    нужно обновлять вместе с колонками файла.
+    """
+
+    def __init__(self, name, model, columns, prepare=None,
+                 derived_fields=()):
+        self.name = name
+        self.filename = f'{name}.csv'
+        self.model = model
+        self.columns = columns
+        self.prepare = prepare
+        self.fields = [
+            model._meta.get_field(field_name)
+            for field_name in columns.values()
+        ]
+        self.update_fields = [
+            field.name for field in self.fields if not field.primary_key
+        ] + list(derived_fields)
+
+    def __str__(self):
+        return self.name
+
+    def to_instance(self, row):
+        """Создаёт несохранённый объект модели из строки CSV."""
+        values = {
+            field.attname: parse_value(field, row.get(column, ''))
+            for column, field in zip(self.columns, self.fields)
+        }
+        instance = self.model(**values)
+        if self.prepare:
+            self.prepare(instance)
+        return instance
+
+    def row_digest(self, row):
+        """Хеш содержимого строки CSV для поиска изменившихся строк."""
+        content = '\x1f'.join(row.get(column, '') for column in self.columns)
+        return hashlib.blake2b(
+            content.encode(), digest_size=16
+        ).hexdigest()
+
+    def to_row(self, instance):
+        """Возвращает значения колонок CSV для объекта модели."""
+        return [
+            format_value(getattr(instance, field.attname))
+            for field in self.fields
+        ]
+
+
+def parse_value(field, value):
+    if value == '':
+        return None if field.null else field.get_default()
+    if field.is_relation:
+        return int(value)
+    if isinstance(field, models.DateField):
+        moment = parse_datetime(value)
+        return moment.date() if moment else parse_date(value)
+    return field.to_python(value)
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def prepare_user(user):
+    user.username_search = normalize_search_text(user.username)
+    user.password = make_password(None)
+
+
+def prepare_name_search(instance):
+    instance.name_search = normalize_search_text(instance.name)
+
+
+# Таблицы перечислены в порядке зависимостей: каждая ссылается
+# только на таблицы, стоящие выше.
+DATASET = (
+    DatasetTable('users', User, {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'role': 'role',
+        'bio': 'bio',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+    }, prepare=prepare_user, derived_fields=['username_search']),
+    DatasetTable('category', Category, {
+        'id': 'id',
+        'name': 'name',
+        'slug': 'slug',
+    }, prepare=prepare_name_search, derived_fields=['name_search']),
+    DatasetTable('genre', Genre, {
+        'id': 'id',
+        'name': 'name',
+        'slug': 'slug',
+    }, prepare=prepare_name_search, derived_fields=['name_search']),
+    DatasetTable('titles', Title, {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'category': 'category',
+    }),
+    DatasetTable('genre_title', GenreTitle, {
+        'id': 'id',
+        'title_id': 'title',
+        'genre_id': 'genre',
+    }),
+    DatasetTable('review', Review, {
+        'id': 'id',
+        'title_id': 'title',
+        'text': 'text',
+        'author': 'author',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }),
+    DatasetTable('comments', Comment, {
+        'id': 'id',
+        'review_id': 'review',
+        'text': 'text',
+        'author': 'author',
+        'pub_date': 'pub_date',
+    }),
+)
+
+DATASET_TABLES = {table.name: table for table in DATASET}
+
+
+def read_rows(path):
+    """Построчно читает CSV-файл, не загружая его целиком в память."""
+    with open(path, encoding='utf-8-sig', newline='') as csv_file:
+        yield from csv.DictReader(csv_file)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def keep_auto_dates(model):
+    """
+    Отключает auto_now_add у полей модели на время загрузки.
+
+    Иначе bulk_create заменит даты из файла на текущую.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def touch_auto_now(model, instances):
+    """
+    Заполняет поля auto_now текущим временем и возвращает их имена.
+
+    bulk_update, в отличие от save, эти поля не обновляет.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+    ]
+    for instance in instances:
+        for field in fields:
+            field.pre_save(instance, add=False)
+    return [field.name for field in fields]
@@ -0,0 +1,104 @@
+"""
+Словари жанров и категорий в памяти процесса.
+
+Таблицы жанров и категорий маленькие и меняются редко, поэтому
+каждый процесс держит их целиком: слаг, id и название. Перед
+использованием словарь сверяет свою версию с версией группы
+в кеше и перечитывает таблицу, если версия сменилась или снимок
+старше DICTIONARY_MAX_AGE. Запись, которой нет в снимке, ищется
+в базе: её могли добавить в другом процессе.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.db import DEFAULT_DB_ALIAS
+
+from api_yamdb.settings import DICTIONARY_MAX_AGE
+from .models import Category, Genre
+from .versions import CATEGORIES, GENRES, get_version
+
+# Порядок полей совпадает с порядком полей модели: так запись можно
+# передать в Model.from_db.
+Entry = namedtuple('Entry', 'id name slug')
+Snapshot = namedtuple('Snapshot', 'version expires by_id by_slug')
+
+
+class SlugDictionary:
+
+    def __init__(self, model, family):
+        self.model = model
+        self.family = family
+        self.snapshot = Snapshot(None, 0, {}, {})
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Поля сериализаторов копируются при каждом создании
+        # сериализатора, а словарь должен остаться общим.
+        return self
+
+    def get(self):
+        """
+        Возвращает актуальный снимок словаря.
+
+        Версия читается до таблицы: если таблица изменится во время
+        чтения, версия в кеше уже не совпадёт с сохранённой, и
+        следующий вызов прочитает таблицу заново.
+        """
+        version = get_version(self.family)
+        snapshot = self.snapshot
+        if is_current(snapshot, version):
+            return snapshot
+        with self.lock:
+            if not is_current(self.snapshot, version):
+                self.snapshot = self.load(version)
+            return self.snapshot
+
+    def find_slug(self, snapshot, slug):
+        """Запись по слагу и снимок, в котором она найдена."""
+        return self.find(snapshot, 'by_slug', slug, {'slug': slug})
+
+    def find_id(self, snapshot, pk):
+        """Запись по id и снимок, в котором она найдена."""
+        return self.find(snapshot, 'by_id', pk, {'pk': pk})
+
+    def find(self, snapshot, index, key, lookup):
+        """
+        Ищет запись в снимке, а если её там нет — в базе.
+
+        Таблица перечитывается, только если запись в ней есть, поэтому
+        несуществующий слаг стоит одного запроса по индексу.
+        """
+        entry = getattr(snapshot, index).get(key)
+        if entry is not None or key is None:
+            return entry, snapshot
+        if not self.model.objects.filter(**lookup).exists():
+            return None, snapshot
+        with self.lock:
+            snapshot = self.snapshot = self.load(get_version(self.family))
+        return getattr(snapshot, index).get(key), snapshot
+
+    def load(self, version):
+        entries = [
+            Entry(*row) for row in self.model.objects.order_by(
+                'id'
+            ).values_list(*Entry._fields)
+        ]
+        return Snapshot(
+            version,
+            time.monotonic() + DICTIONARY_MAX_AGE,
+            {entry.id: entry for entry in entries},
+            {entry.slug: entry for entry in entries},
+        )
+
+    def instance(self, entry):
+        """Объект модели из записи словаря, как будто прочитанный из базы."""
+        return self.model.from_db(DEFAULT_DB_ALIAS, Entry._fields, entry)
+
+
+def is_current(snapshot, version):
+    return snapshot.version == version and time.monotonic() < snapshot.expires
+
+
+genre_dictionary = SlugDictionary(Genre, GENRES)
+category_dictionary = SlugDictionary(Category, CATEGORIES)
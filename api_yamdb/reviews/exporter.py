@@ -0,0 +1,100 @@
+"""Потоковая выгрузка данных в формате static/data или JSON Lines."""
+import csv
+import json
+import zlib
+
+from .dataset import format_value
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+# Фильтры выгрузки: путь к слагу категории и к дате публикации
+# для таблиц, к которым они применимы.
+CATEGORY_LOOKUPS = {
+    'category': 'slug',
+    'titles': 'category__slug',
+    'genre_title': 'title__category__slug',
+    'review': 'title__category__slug',
+    'comments': 'review__title__category__slug',
+}
+DATE_LOOKUPS = {
+    'review': 'pub_date',
+    'comments': 'pub_date',
+}
+
+
+def export_queryset(table, category=None, date_from=None, date_to=None):
+    queryset = table.model.objects.order_by('pk')
+    if category and table.name in CATEGORY_LOOKUPS:
+        queryset = queryset.filter(**{CATEGORY_LOOKUPS[table.name]: category})
+    if table.name in DATE_LOOKUPS:
+        lookup = DATE_LOOKUPS[table.name]
+        if date_from:
+            queryset = queryset.filter(**{f'{lookup}__gte': date_from})
+        if date_to:
+            queryset = queryset.filter(**{f'{lookup}__lte': date_to})
+    return queryset.values_list(*(field.attname for field in table.fields))
+
+
+def iter_rows(queryset, chunk_size=2000):
+    """
+    Отдаёт строки выборки порциями по первичному ключу.
+
+    Каждая порция — отдельный запрос pk > последний, поэтому память
+    не растёт с размером таблицы и не держится долгий курсор.
+    Первым значением строки должен быть первичный ключ.
+    """
+    last_pk = None
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return
+        yield from rows
+        last_pk = rows[-1][0]
+
+
+class LineBuffer:
+    """Файлоподобный объект, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(table, rows):
+    writer = csv.writer(LineBuffer(), lineterminator='\n')
+    yield writer.writerow(table.columns)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def iter_jsonl(table, rows):
+    columns = list(table.columns)
+    for row in rows:
+        yield json.dumps(
+            dict(zip(columns, (format_value(value) for value in row))),
+            ensure_ascii=False,
+        ) + '\n'
+
+
+def iter_export(table, export_format='csv', compress=False, chunk_size=2000,
+                **filters):
+    """Генерирует байты выгрузки таблицы в выбранном формате."""
+    rows = iter_rows(export_queryset(table, **filters), chunk_size)
+    lines = (iter_csv if export_format == 'csv' else iter_jsonl)(table, rows)
+    encoded = (line.encode() for line in lines)
+    return gzip_stream(encoded) if compress else encoded
+
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_filename(table, export_format='csv', compress=False):
+    return f'{table.name}.{export_format}' + ('.gz' if compress else '')
@@ -0,0 +1,221 @@
+"""
+Воспроизводимая генерация синтетических данных в формате static/data.
+
+Строки генерируются как словари колонок CSV, поэтому их можно
+записать в файлы или загрузить в базу тем же путём, что и import_csv.
+Каждая таблица получает собственный генератор случайных чисел,
+зависящий только от seed и имени таблицы: таблицы можно генерировать
+независимо и в любом порядке, результат от этого не меняется.
+"""
+import csv
+import datetime
+import os
+import random
+from collections import namedtuple
+
+from users.models import User
+
+DatasetSize = namedtuple(
+    'DatasetSize',
+    'users categories genres titles reviews comments_per_review'
+)
+
+PRESETS = {
+    '1k': DatasetSize(
+        users=200, categories=3, genres=10, titles=100, reviews=1000,
+        comments_per_review=0.5,
+    ),
+    '10k': DatasetSize(
+        users=1000, categories=5, genres=20, titles=500, reviews=10_000,
+        comments_per_review=0.5,
+    ),
+    '1m': DatasetSize(
+        users=50_000, categories=10, genres=50, titles=20_000,
+        reviews=1_000_000, comments_per_review=0.5,
+    ),
+    '10m': DatasetSize(
+        users=200_000, categories=10, genres=100, titles=100_000,
+        reviews=10_000_000, comments_per_review=0.5,
+    ),
+}
+
+# Показатель степенного распределения отзывов по произведениям:
+# у произведения с номером k по популярности вес 1 / k ** REVIEWS_SKEW.
+REVIEWS_SKEW = 0.8
+MAX_GENRES_PER_TITLE = 3
+FIRST_YEAR = 1900
+LAST_YEAR = 2023
+FIRST_PUB_DATE = datetime.date(2015, 1, 1)
+PUB_DAYS = 365 * 8
+
+WORDS = (
+    'время', 'город', 'дорога', 'жизнь', 'звезда', 'зима', 'игра', 'история',
+    'книга', 'лето', 'любовь', 'мир', 'море', 'ночь', 'огонь', 'песня',
+    'река', 'сад', 'свет', 'сердце', 'сила', 'слово', 'солнце', 'сон',
+    'тайна', 'тень', 'ветер', 'война', 'голос', 'дом', 'друг', 'небо',
+)
+ROLE_WEIGHTS = ((User.USER, 97), (User.MODERATOR, 2), (User.ADMIN, 1))
+
+
+class DatasetGenerator:
+    """Генерирует строки всех таблиц выгрузки для заданного размера."""
+
+    def __init__(self, size, seed=0):
+        if size.reviews > size.titles * size.users:
+            raise ValueError(
+                'Отзывов больше, чем пар произведение — пользователь.'
+            )
+        self.size = size
+        self.seed = seed
+
+    def random(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def rows(self, table_name):
+        """Возвращает итератор строк таблицы в формате CSV."""
+        return getattr(self, f'generate_{table_name}')()
+
+    def reviews_per_title(self):
+        """
+        Число отзывов каждого произведения.
+
+        Отзывы распределяются по степенному закону, но не больше,
+        чем пользователей: один пользователь — один отзыв на
+        произведение. Избыток популярных произведений достаётся
+        следующим по популярности.
+        """
+        weights = [
+            1 / rank ** REVIEWS_SKEW
+            for rank in range(1, self.size.titles + 1)
+        ]
+        total_weight = sum(weights)
+        counts = [
+            int(self.size.reviews * weight / total_weight)
+            for weight in weights
+        ]
+        excess = self.size.reviews - sum(counts)
+        for index, count in enumerate(counts):
+            if count > self.size.users:
+                excess += count - self.size.users
+                counts[index] = self.size.users
+        while excess:
+            for index, count in enumerate(counts):
+                if count < self.size.users:
+                    counts[index] += 1
+                    excess -= 1
+                    if not excess:
+                        break
+        return counts
+
+    def text(self, rng, words):
+        return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+    def pub_date(self, rng):
+        return FIRST_PUB_DATE + datetime.timedelta(days=rng.randrange(
+            PUB_DAYS
+        ))
+
+    def generate_users(self):
+        rng = self.random('users')
+        roles, weights = zip(*ROLE_WEIGHTS)
+        for user_id in range(1, self.size.users + 1):
+            yield {
+                'id': str(user_id),
+                'username': f'user{user_id}',
+                'email': f'user{user_id}@yamdb.fake',
+                'role': rng.choices(roles, weights)[0],
+                'bio': '',
+                'first_name': '',
+                'last_name': '',
+            }
+
+    def generate_category(self):
+        for category_id in range(1, self.size.categories + 1):
+            yield {
+                'id': str(category_id),
+                'name': f'Категория {category_id}',
+                'slug': f'category-{category_id}',
+            }
+
+    def generate_genre(self):
+        for genre_id in range(1, self.size.genres + 1):
+            yield {
+                'id': str(genre_id),
+                'name': f'Жанр {genre_id}',
+                'slug': f'genre-{genre_id}',
+            }
+
+    def generate_titles(self):
+        rng = self.random('titles')
+        for title_id in range(1, self.size.titles + 1):
+            yield {
+                'id': str(title_id),
+                'name': self.text(rng, rng.randint(1, 4)),
+                'year': str(rng.randint(FIRST_YEAR, LAST_YEAR)),
+                'category': str(rng.randint(1, self.size.categories)),
+            }
+
+    def generate_genre_title(self):
+        rng = self.random('genre_title')
+        row_id = 0
+        genres = range(1, self.size.genres + 1)
+        for title_id in range(1, self.size.titles + 1):
+            count = rng.randint(1, min(MAX_GENRES_PER_TITLE, len(genres)))
+            for genre_id in sorted(rng.sample(genres, count)):
+                row_id += 1
+                yield {
+                    'id': str(row_id),
+                    'title_id': str(title_id),
+                    'genre_id': str(genre_id),
+                }
+
+    def generate_review(self):
+        rng = self.random('review')
+        row_id = 0
+        users = range(1, self.size.users + 1)
+        for title_id, count in enumerate(self.reviews_per_title(), 1):
+            for author in rng.sample(users, count):
+                row_id += 1
+                yield {
+                    'id': str(row_id),
+                    'title_id': str(title_id),
+                    'text': self.text(rng, rng.randint(5, 30)),
+                    'author': str(author),
+                    'score': str(rng.randint(1, 10)),
+                    'pub_date': self.pub_date(rng).isoformat(),
+                }
+
+    def generate_comments(self):
+        """
+        Комментарии к отзывам: число на отзыв распределено
+        геометрически со средним comments_per_review.
+        """
+        rng = self.random('comments')
+        mean = self.size.comments_per_review
+        more = mean / (1 + mean)
+        row_id = 0
+        for review_id in range(1, self.size.reviews + 1):
+            while mean and rng.random() < more:
+                row_id += 1
+                yield {
+                    'id': str(row_id),
+                    'review_id': str(review_id),
+                    'text': self.text(rng, rng.randint(3, 15)),
+                    'author': str(rng.randint(1, self.size.users)),
+                    'pub_date': self.pub_date(rng).isoformat(),
+                }
+
+
+def write_csv(table, rows, directory):
+    """Записывает строки таблицы в файл формата static/data."""
+    path = os.path.join(directory, table.filename)
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.DictWriter(
+            csv_file, fieldnames=list(table.columns), lineterminator='\n'
+        )
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
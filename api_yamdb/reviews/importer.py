@@ -0,0 +1,237 @@
+"""Загрузка CSV-файлов в формате static/data в базу данных."""
+import time
+from collections import deque, namedtuple
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import F
+
+from users.cache import invalidate_user
+from users.models import User
+from .dataset import (DATASET_TABLES, batched, keep_auto_dates, read_rows,
+                      touch_auto_now)
+from .models import (Category, DatasetChecksum, Genre, GenreTitle, Review,
+                     Title)
+from .signals import touch_titles
+from .versions import TITLES, bump_versions
+
+ImportResult = namedtuple(
+    'ImportResult', 'table rows changed elapsed touched_titles'
+)
+# Объекты модели и хеши строк одного пакета CSV.
+PreparedBatch = namedtuple('PreparedBatch', 'instances digests')
+
+
+def prepare_batch(table, batch):
+    """Разбирает пакет строк CSV, не обращаясь к базе."""
+    return PreparedBatch(
+        [table.to_instance(row) for row in batch],
+        {int(row['id']): table.row_digest(row) for row in batch},
+    )
+
+
+def prepare_batches(table, batches):
+    for batch in batches:
+        yield prepare_batch(table, batch)
+
+
+def import_table(table, path, **options):
+    """Загружает один CSV-файл пакетами и возвращает ImportResult."""
+    return import_rows(table, read_rows(path), **options)
+
+
+def import_rows(table, rows, batch_size=2000, transaction_size=50000,
+                ignore_conflicts=False, incremental=False,
+                prepare=prepare_batches):
+    """
+    Загружает строки в формате CSV пакетами и возвращает ImportResult.
+
+    В обычном режиме строки вставляются bulk_create. В режиме
+    incremental в базу попадают только строки, хеш которых
+    отличается от сохранённого: новые вставляются, остальные
+    обновляются bulk_update. Хеши сохраняются в обоих режимах.
+    bulk_create и bulk_update не отправляют сигналы, поэтому
+    версии кеша ответов, даты изменения произведений, в выводе которых
+    поменялись жанры или категория, а для пользователей с изменившейся
+    ролью — версии прав в токенах и кеш аутентификации меняются здесь.
+
+    prepare превращает пакеты строк в PreparedBatch; пишет в базу
+    всегда вызывающий процесс.
+    """
+    started = time.monotonic()
+    total = changed = 0
+    touched_titles = set()
+    batches_per_transaction = max(transaction_size // batch_size, 1)
+    chunks = batched(
+        prepare(table, batched(rows, batch_size)), batches_per_transaction
+    )
+    with keep_auto_dates(table.model):
+        for chunk in chunks:
+            with transaction.atomic():
+                for batch in chunk:
+                    total += len(batch.instances)
+                    if incremental:
+                        changed += upsert_batch(table, batch, touched_titles)
+                    else:
+                        changed += insert_batch(
+                            table, batch, ignore_conflicts
+                        )
+    reset_sequence(table.model)
+    if changed:
+        bump_versions()
+    return ImportResult(
+        table.name, total, changed, time.monotonic() - started, touched_titles
+    )
+
+
+def insert_batch(table, batch, ignore_conflicts):
+    table.model.objects.bulk_create(
+        batch.instances, ignore_conflicts=ignore_conflicts
+    )
+    DatasetChecksum.objects.bulk_create(
+        (
+            DatasetChecksum(table=table.name, row_id=row_id, digest=digest)
+            for row_id, digest in batch.digests.items()
+        ),
+        ignore_conflicts=ignore_conflicts,
+    )
+    return len(batch.instances)
+
+
+def upsert_batch(table, batch, touched_titles):
+    digests = batch.digests
+    stored = dict(DatasetChecksum.objects.filter(
+        table=table.name, row_id__in=digests
+    ).values_list('row_id', 'digest'))
+    changed = [
+        instance for instance in batch.instances
+        if stored.get(instance.pk) != digests[instance.pk]
+    ]
+    if not changed:
+        return 0
+    changed_ids = [instance.pk for instance in changed]
+    if table.model is Review:
+        existing = dict(Review.objects.filter(
+            pk__in=changed_ids
+        ).values_list('pk', 'title_id'))
+        touched_titles.update(existing.values())
+        touched_titles.update(instance.title_id for instance in changed)
+    elif table.model is GenreTitle:
+        existing = dict(GenreTitle.objects.filter(
+            pk__in=changed_ids
+        ).values_list('pk', 'title_id'))
+    elif table.model is User:
+        existing = {
+            pk: privileges for pk, *privileges in User.objects.filter(
+                pk__in=changed_ids
+            ).values_list('pk', *privilege_fields(table))
+        }
+    else:
+        existing = set(table.model.objects.filter(
+            pk__in=changed_ids
+        ).values_list('pk', flat=True))
+    table.model.objects.bulk_create(
+        [instance for instance in changed if instance.pk not in existing]
+    )
+    updated = [instance for instance in changed if instance.pk in existing]
+    table.model.objects.bulk_update(
+        updated,
+        table.update_fields + touch_auto_now(table.model, updated),
+    )
+    if table.model is Genre:
+        touch_titles(genre__in=[genre.pk for genre in updated])
+    elif table.model is Category:
+        touch_titles(category__in=[category.pk for category in updated])
+    elif table.model is GenreTitle:
+        # Связь могла перейти к другому произведению: меняется вывод
+        # и прежнего, и нового.
+        touch_titles(pk__in={
+            *existing.values(), *(link.title_id for link in changed)
+        })
+    elif table.model is User:
+        revoke_privileges([
+            user.pk for user in updated
+            if existing[user.pk] != [
+                getattr(user, field) for field in privilege_fields(table)
+            ]
+        ])
+    DatasetChecksum.objects.filter(
+        table=table.name, row_id__in=changed_ids
+    ).delete()
+    DatasetChecksum.objects.bulk_create(
+        DatasetChecksum(
+            table=table.name, row_id=row_id, digest=digests[row_id]
+        )
+        for row_id in changed_ids
+    )
+    return len(changed)
+
+
+def privilege_fields(table):
+    """Поля прав пользователя, которые есть в файле."""
+    return [
+        field for field in User.PRIVILEGE_FIELDS
+        if field in table.update_fields
+    ]
+
+
+def revoke_privileges(user_ids):
+    """
+    Меняет версию прав в токенах и сбрасывает кеш аутентификации
+    пользователей, чьи права изменил bulk_update.
+    """
+    if not user_ids:
+        return
+    User.objects.filter(pk__in=user_ids).update(
+        token_version=F('token_version') + 1
+    )
+    for user_id in user_ids:
+        invalidate_user(user_id)
+
+
+def prepare_batch_in_worker(name, batch):
+    """Точка входа для процесса, разбирающего пакет строк."""
+    return prepare_batch(DATASET_TABLES[name], batch)
+
+
+def prepare_in_workers(executor, window, table, batches):
+    """
+    Разбирает пакеты в процессах executor, сохраняя их порядок.
+
+    Одновременно в работе не больше window пакетов, поэтому файл
+    не читается в память целиком, пока база принимает записанное.
+    """
+    pending = deque()
+    for batch in batches:
+        pending.append(
+            executor.submit(prepare_batch_in_worker, table.name, batch)
+        )
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def rebuild_ratings(results, incremental=False):
+    """Пересчитывает рейтинги произведений после загрузки."""
+    titles = Title.objects.all()
+    if incremental:
+        titles = titles.filter(pk__in=set().union(
+            *(result.touched_titles for result in results)
+        ))
+    elif not {'titles', 'review'} & {result.table for result in results}:
+        return
+    if titles.rebuild_ratings():
+        bump_versions(TITLES)
+
+
+def reset_sequence(model):
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
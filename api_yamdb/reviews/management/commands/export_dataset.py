@@ -0,0 +1,65 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.dataset import DATASET, DATASET_TABLES
+from reviews.exporter import EXPORT_FORMATS, export_filename, iter_export
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает данные в формате static/data/*.csv или JSON Lines '
+        'без загрузки таблиц в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Каталог для файлов выгрузки.')
+        parser.add_argument(
+            '--tables', nargs='+', choices=list(DATASET_TABLES),
+            help='Выгрузить только указанные таблицы.'
+        )
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='csv'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать файлы gzip.'
+        )
+        parser.add_argument(
+            '--category', help='Только данные произведений этой категории.'
+        )
+        parser.add_argument(
+            '--date-from', help='Отзывы и комментарии не раньше даты.'
+        )
+        parser.add_argument(
+            '--date-to', help='Отзывы и комментарии не позже даты.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output'], exist_ok=True)
+        for table in DATASET:
+            if options['tables'] and table.name not in options['tables']:
+                continue
+            started = time.monotonic()
+            path = os.path.join(options['output'], export_filename(
+                table, options['export_format'], options['gzip']
+            ))
+            size = 0
+            with open(path, 'wb') as export_file:
+                for chunk in iter_export(
+                    table,
+                    export_format=options['export_format'],
+                    compress=options['gzip'],
+                    chunk_size=options['chunk_size'],
+                    category=options['category'],
+                    date_from=options['date_from'],
+                    date_to=options['date_to'],
+                ):
+                    export_file.write(chunk)
+                    size += len(chunk)
+            self.stdout.write(
+                f'{table.name}: {path}, {size} байт, '
+                f'{time.monotonic() - started:.2f} с'
+            )
@@ -0,0 +1,81 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.dataset import DATASET, DATASET_TABLES
+from reviews.generator import PRESETS, DatasetGenerator, write_csv
+from reviews.importer import import_rows, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует воспроизводимые синтетические данные и загружает их '
+        'в базу пакетами bulk_create или записывает в формате static/data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--preset', choices=list(PRESETS), default='10k',
+            help='Размер данных по количеству отзывов.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Одинаковый seed даёт одинаковые данные.'
+        )
+        for field in PRESETS['10k']._fields:
+            parser.add_argument(
+                f'--{field.replace("_", "-")}',
+                type=float if field == 'comments_per_review' else int,
+                help='Заменяет значение пресета.'
+            )
+        parser.add_argument(
+            '--output',
+            help='Каталог для CSV-файлов; без него данные пишутся в базу.'
+        )
+        parser.add_argument(
+            '--tables', nargs='+', choices=list(DATASET_TABLES),
+            help='Сгенерировать только указанные таблицы.'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--transaction-size', type=int, default=50000)
+
+    def handle(self, *args, **options):
+        size = PRESETS[options['preset']]._replace(**{
+            field: options[field] for field in PRESETS['10k']._fields
+            if options[field] is not None
+        })
+        try:
+            generator = DatasetGenerator(size, seed=options['seed'])
+        except ValueError as error:
+            raise CommandError(error)
+        if options['output']:
+            os.makedirs(options['output'], exist_ok=True)
+        started = time.monotonic()
+        results = []
+        for table in DATASET:
+            if options['tables'] and table.name not in options['tables']:
+                continue
+            rows = generator.rows(table.name)
+            if options['output']:
+                table_started = time.monotonic()
+                count = write_csv(table, rows, options['output'])
+                self.stdout.write(
+                    f'{table.name}: {count} строк, '
+                    f'{time.monotonic() - table_started:.2f} с'
+                )
+                continue
+            result = import_rows(
+                table, rows,
+                batch_size=options['batch_size'],
+                transaction_size=options['transaction_size'],
+            )
+            self.stdout.write(
+                f'{result.table}: {result.rows} строк, '
+                f'{result.elapsed:.2f} с'
+            )
+            results.append(result)
+        rebuild_ratings(results)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.2f} с'
+        ))
@@ -0,0 +1,118 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.dataset import DATASET, DATASET_TABLES
+from reviews.importer import (import_table, init_worker, prepare_batches,
+                              prepare_in_workers, rebuild_ratings)
+
+# Сколько пакетов на процесс разбирается впрок, пока идёт запись.
+BATCHES_PER_WORKER = 2
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает CSV-файлы в формате static/data пакетами bulk_create '
+        'с сохранением id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=os.path.join(settings.BASE_DIR, 'static/data'),
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--tables', nargs='+', choices=list(DATASET_TABLES),
+            help='Загрузить только указанные таблицы.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--transaction-size', type=int, default=50000,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, которые уже есть в базе.'
+        )
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help=(
+                'Загружать только новые и изменившиеся строки, '
+                'сравнивая хеши содержимого.'
+            )
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help=(
+                'Количество процессов, которые разбирают строки и считают '
+                'хеши; в базу пишет один процесс. 1 — без дочерних '
+                'процессов. Передача разобранных строк из процессов '
+                'обходится дороже самого разбора, поэтому с SQLite, где '
+                'вставка идёт в одну запись, процессы загрузку замедляют.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        tables = [
+            table for table in DATASET
+            if not options['tables'] or table.name in options['tables']
+        ]
+        paths = {}
+        for table in tables:
+            paths[table.name] = os.path.join(options['path'], table.filename)
+            if not os.path.exists(paths[table.name]):
+                raise CommandError(f'Файл {paths[table.name]} не найден.')
+        import_options = {
+            'batch_size': options['batch_size'],
+            'transaction_size': options['transaction_size'],
+            'ignore_conflicts': options['ignore_conflicts'],
+            'incremental': options['incremental'],
+        }
+        started = time.monotonic()
+        with self.batch_preparer(options['workers']) as prepare:
+            results = [
+                self.report(import_table(
+                    table, paths[table.name], prepare=prepare,
+                    **import_options
+                ))
+                for table in tables
+            ]
+        rebuild_ratings(results, options['incremental'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего: {sum(result.rows for result in results)} строк, '
+            f'изменено {sum(result.changed for result in results)}, '
+            f'{time.monotonic() - started:.2f} с'
+        ))
+
+    @contextmanager
+    def batch_preparer(self, workers):
+        """
+        Строки разбираются в дочерних процессах, а записываются
+        в текущем: параллельные записи в SQLite упирались бы в
+        блокировку базы.
+        """
+        if workers <= 1:
+            yield prepare_batches
+            return
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker
+        ) as executor:
+            yield partial(
+                prepare_in_workers, executor, workers * BATCHES_PER_WORKER
+            )
+
+    def report(self, result):
+        rate = result.rows / result.elapsed if result.elapsed else result.rows
+        self.stdout.write(
+            f'{result.table}: {result.rows} строк, изменено '
+            f'{result.changed}, {result.elapsed:.2f} с ({rate:.0f} строк/с)'
+        )
+        return result
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetChecksum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=32, verbose_name='Таблица')),
+                ('row_id', models.BigIntegerField(verbose_name='id строки')),
+                ('digest', models.CharField(max_length=32, verbose_name='Хеш строки')),
+            ],
+            options={
+                'verbose_name': 'Контрольная сумма строки',
+                'verbose_name_plural': 'Контрольные суммы строк',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='datasetchecksum',
+            constraint=models.UniqueConstraint(fields=('table', 'row_id'), name='unique_table_row'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from reviews.search import (CATEGORY_SEARCH, GENRE_SEARCH, drop_search_index,
+                            ensure_search_index)
+
+
+def create_search_indexes(apps, schema_editor):
+    for index in (CATEGORY_SEARCH, GENRE_SEARCH):
+        ensure_search_index(schema_editor.connection, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    for index in (CATEGORY_SEARCH, GENRE_SEARCH):
+        drop_search_index(schema_editor.connection, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, remove_search_indexes),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_name_search_fts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='name_search',
+            field=models.CharField(default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+    ]
@@ -1,13 +1,23 @@
 from django.core.validators import (MaxValueValidator, MinValueValidator)
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from users.models import User
+from .search import normalize_search_text
 from .validators import validate_year
+from .versions import TITLES, bump_versions
 
 
 class CommonGenreCat(models.Model):
     name = models.CharField(max_length=256, verbose_name='Название')
     slug = models.SlugField(unique=True, verbose_name='Слаг')
+    name_search = models.CharField(
+        max_length=256, editable=False, default='',
+        verbose_name='Название для поиска'
+    )
 
     class Meta:
         abstract = True
@@ -17,6 +27,10 @@ class CommonGenreCat(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.name_search = normalize_search_text(self.name)
+        super().save(*args, **kwargs)
+
 
 class Genre(CommonGenreCat):
     class Meta:
@@ -30,6 +44,37 @@ class Category(CommonGenreCat):
         verbose_name_plural = 'Категории'
 
 
+def genre_links():
+    """Связи произведений с жанрами без чтения таблицы жанров."""
+    return Prefetch(
+        'genretitle_set', queryset=GenreTitle.objects.order_by('id'),
+        to_attr='genre_links'
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+
+    def with_genre_links(self):
+        return self.prefetch_related(genre_links())
+
+    def rebuild_ratings(self):
+        """Пересчитывает сумму и количество оценок по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            modified=timezone.now(),
+        )
+
+
 class Title(models.Model):
     name = models.CharField(max_length=256, verbose_name="Название")
     year = models.PositiveSmallIntegerField(null=True, blank=True,
@@ -40,7 +85,20 @@ class Title(models.Model):
     category = models.ForeignKey('Category', on_delete=models.DO_NOTHING,
                                  related_name='titles',
                                  verbose_name="Категория")
-    genre = models.ManyToManyField('Genre', verbose_name="Жанры")
+    genre = models.ManyToManyField(
+        'Genre', through='GenreTitle', verbose_name="Жанры"
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Сумма оценок"
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Количество оценок"
+    )
+    modified = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -48,6 +106,96 @@ class Title(models.Model):
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+        ]
+
+    @property
+    def genre_ids(self):
+        """id жанров; без with_genre_links читаются отдельным запросом."""
+        links = getattr(self, 'genre_links', None)
+        if links is None:
+            links = self.genretitle_set.order_by('id')
+        return [link.genre_id for link in links]
+
+    @property
+    def rating(self):
+        """Средняя оценка произведения или None, если отзывов нет."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @classmethod
+    def update_rating(cls, title_id, score_delta, count_delta):
+        """Атомарно сдвигает сохранённые сумму и количество оценок."""
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta,
+            modified=timezone.now(),
+        )
+
+
+class GenreTitle(models.Model):
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, verbose_name='Произведение'
+    )
+    genre = models.ForeignKey(
+        Genre, on_delete=models.CASCADE, verbose_name='Жанр'
+    )
+
+    class Meta:
+        db_table = 'reviews_title_genre'
+        unique_together = ('title', 'genre')
+        verbose_name = 'Жанр произведения'
+        verbose_name_plural = 'Жанры произведений'
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='genre_title_genre_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title} — {self.genre}'
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def stored_ratings(self):
+        """
+        Произведения и оценки отзывов по данным базы.
+
+        Строки блокируются до конца транзакции (в SQLite запись и так
+        идёт одна), поэтому одновременное изменение тех же отзывов
+        дождётся её окончания и прочитает уже новые оценки.
+        """
+        return list(self.select_for_update().order_by().values_list(
+            'title_id', 'score'
+        ))
+
+    def delete(self):
+        """Удаляет отзывы и вычитает их оценки из рейтингов."""
+        with transaction.atomic(using=self.db, savepoint=False):
+            removed = {}
+            for title_id, score in self.stored_ratings():
+                total, count = removed.get(title_id, (0, 0))
+                removed[title_id] = (total + score, count + 1)
+            deleted = super().delete()
+            for title_id, (total, count) in removed.items():
+                Title.update_rating(title_id, -total, -count)
+            if removed:
+                bump_versions(TITLES)
+        return deleted
+
+    def with_comments_count(self):
+        """Добавляет к отзывам количество комментариев."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(total=Count('id'))
+        return self.annotate(
+            comments_count=Coalesce(Subquery(comments.values('total')), 0)
+        )
 
 
 class Review(models.Model):
@@ -69,6 +217,11 @@ class Review(models.Model):
     )
     pub_date = models.DateField(
         auto_now_add=True, db_index=True, verbose_name='Дата публикации')
+    modified = models.DateTimeField(
+        auto_now=True, verbose_name='Дата изменения'
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         ordering = ['id']
@@ -80,10 +233,67 @@ class Review(models.Model):
                 name='unique_author_title'
             )
         ]
+        indexes = [
+            models.Index(fields=['title', 'id'], name='review_title_id_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
+    def stored_rating(self):
+        """
+        Произведение и оценка отзыва в базе или None.
+
+        Читаются в транзакции сохранения или удаления, а не берутся
+        из объекта, который мог устареть: рейтинг сдвигается на
+        разницу с тем, что действительно было записано.
+        """
+        if self._state.adding:
+            return None
+        ratings = Review.objects.using(self._state.db).filter(
+            pk=self.pk
+        ).stored_ratings()
+        return ratings[0] if ratings else None
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения сдвигается в post_save, поэтому
+        # сохранение отзыва и сдвиг рейтинга идут одной транзакцией.
+        with transaction.atomic(using=kwargs.get('using')):
+            self._stored_rating = self.stored_rating()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            self._stored_rating = self.stored_rating()
+            return super().delete(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def first_per_review(self, review_ids, limit):
+        """
+        Оставляет не больше limit первых комментариев каждого отзыва.
+
+        Для каждого отзыва из review_ids берётся ORDER BY id LIMIT по
+        индексу (review, id), а выборки склеиваются UNION ALL: отзыв
+        с тысячами комментариев обходится так же, как отзыв с тремя.
+        """
+        review_ids = list(review_ids)
+        if not review_ids:
+            return self.none()
+        quote = connection.ops.quote_name
+        first_ids = (
+            'SELECT * FROM (SELECT {id} FROM {table} WHERE {review} = %s '
+            'ORDER BY {id} LIMIT %s)'
+        ).format(
+            id=quote('id'), table=quote(Comment._meta.db_table),
+            review=quote(Comment._meta.get_field('review').column),
+        )
+        return self.filter(id__in=RawSQL(
+            ' UNION ALL '.join([first_ids] * len(review_ids)),
+            [value for review_id in review_ids for value in (review_id, limit)]
+        ))
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -97,11 +307,57 @@ class Comment(models.Model):
     )
     pub_date = models.DateField(
         auto_now_add=True, db_index=True, verbose_name='Дата публикации')
+    modified = models.DateTimeField(
+        auto_now=True, verbose_name='Дата изменения'
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ['id']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'id'], name='comment_review_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+def attach_first_comments(reviews, limit):
+    """
+    Кладёт в expanded_comments первые limit комментариев отзывов.
+
+    Вызывается для уже выбранных отзывов, например для страницы:
+    комментарии читаются одним запросом только для них.
+    """
+    comments = {review.pk: [] for review in reviews}
+    for comment in Comment.objects.first_per_review(
+        comments, limit
+    ).select_related('author').order_by('id'):
+        comments[comment.review_id].append(comment)
+    for review in reviews:
+        review.expanded_comments = comments[review.pk]
+
+
+class DatasetChecksum(models.Model):
+    """Хеш содержимого строки CSV, загруженной командой import_csv."""
+
+    table = models.CharField(max_length=32, verbose_name='Таблица')
+    row_id = models.BigIntegerField(verbose_name='id строки')
+    digest = models.CharField(max_length=32, verbose_name='Хеш строки')
+
+    class Meta:
+        verbose_name = 'Контрольная сумма строки'
+        verbose_name_plural = 'Контрольные суммы строк'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['table', 'row_id'], name='unique_table_row'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.table}:{self.row_id}'
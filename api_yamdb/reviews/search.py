@@ -0,0 +1,176 @@
+"""Поисковые индексы и нормализация текста для поиска."""
+import re
+import unicodedata
+from collections import namedtuple
+
+# Полнотекстовый индекс FTS5 над колонками таблицы. Индекс хранит
+# только слова, а строки читает из самой таблицы по content_rowid.
+SearchIndex = namedtuple('SearchIndex', 'table columns')
+
+TITLE_SEARCH = SearchIndex('reviews_title', ('name', 'description'))
+# Для категорий, жанров и пользователей индексируются теневые поля,
+# уже приведённые normalize_search_text.
+CATEGORY_SEARCH = SearchIndex('reviews_category', ('name_search',))
+GENRE_SEARCH = SearchIndex('reviews_genre', ('name_search',))
+USER_SEARCH = SearchIndex('users_user', ('username_search',))
+SEARCH_INDEXES = (TITLE_SEARCH, CATEGORY_SEARCH, GENRE_SEARCH, USER_SEARCH)
+
+
+def fts_table(index):
+    return f'{index.table}_fts'
+
+
+def search_triggers(index):
+    """Триггеры, которые поддерживают индекс в актуальном состоянии."""
+    table = fts_table(index)
+    columns = ', '.join(index.columns)
+    new = ', '.join(f'new.{column}' for column in index.columns)
+    old = ', '.join(f'old.{column}' for column in index.columns)
+    insert = f'INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {new});'
+    delete = (
+        f'INSERT INTO {table}({table}, rowid, {columns}) '
+        f"VALUES ('delete', old.id, {old});"
+    )
+    return {
+        f'{table}_insert': f'AFTER INSERT ON {index.table} BEGIN {insert} END',
+        f'{table}_delete': f'AFTER DELETE ON {index.table} BEGIN {delete} END',
+        f'{table}_update': (
+            f'AFTER UPDATE OF {columns} ON {index.table} '
+            f'BEGIN {delete} {insert} END'
+        ),
+    }
+
+
+TITLE_SEARCH_TABLE = fts_table(TITLE_SEARCH)
+# Вес совпадений в названии выше, чем в описании.
+TITLE_SEARCH_RANK = f'bm25({TITLE_SEARCH_TABLE}, 10.0, 1.0)'
+
+SEARCH_TERM = re.compile(r'\w+')
+
+
+def normalize_search_text(value):
+    """
+    Приводит строку к виду, в котором хранятся теневые поля поиска.
+
+    В отличие от LIKE в SQLite, casefold учитывает кириллицу;
+    «ё» приравнивается к «е», пробелы схлопываются.
+    """
+    value = unicodedata.normalize('NFKC', value or '').casefold()
+    return ' '.join(value.replace('ё', 'е').split())
+
+
+def is_search_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def ensure_search_index(connection, index, create=True):
+    """
+    Создаёт FTS5-индекс таблицы и триггеры синхронизации.
+
+    Django пересоздаёт таблицу в SQLite при изменении её схемы,
+    и триггеры при этом удаляются. Поэтому функция вызывается и после
+    каждой миграции (с create=False — только для созданных индексов)
+    и перестраивает индекс, если какого-то триггера не хватало.
+    """
+    if not is_search_supported(connection):
+        return
+    table = fts_table(index)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            'AND name IN (%s, %s)',
+            [index.table, table]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if index.table not in existing or (
+            not create and table not in existing
+        ):
+            return
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} '
+            f'USING fts5({", ".join(index.columns)}, '
+            f'content={index.table}, content_rowid=id, '
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            'AND tbl_name = %s',
+            [index.table]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        triggers = search_triggers(index)
+        missing = set(triggers) - existing
+        for name in missing:
+            cursor.execute(f'CREATE TRIGGER {name} {triggers[name]}')
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {table}({table}) VALUES ('rebuild')"
+            )
+
+
+def drop_search_index(connection, index):
+    if not is_search_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for name in search_triggers(index):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {fts_table(index)}')
+
+
+def ensure_title_search_index(connection):
+    ensure_search_index(connection, TITLE_SEARCH)
+
+
+def drop_title_search_index(connection):
+    drop_search_index(connection, TITLE_SEARCH)
+
+
+def restore_search_indexes(connection):
+    """Возвращает триггеры индексов, если миграция пересоздала таблицу."""
+    for index in SEARCH_INDEXES:
+        ensure_search_index(connection, index, create=False)
+
+
+def find_search_index(model):
+    for index in SEARCH_INDEXES:
+        if index.table == model._meta.db_table:
+            return index
+    return None
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский ввод в запрос FTS5.
+
+    Каждое слово ищется как префикс, все слова должны найтись.
+    Слова берутся в кавычки, поэтому операторы FTS5 во вводе
+    не интерпретируются.
+    """
+    return ' '.join(f'"{term}"*' for term in SEARCH_TERM.findall(text))
+
+
+def search_rows(queryset, index, text, rank=None):
+    """
+    Фильтрует строки по запросу к индексу index.
+
+    Если передано выражение rank, строки сортируются по нему.
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    table = fts_table(index)
+    extra = {}
+    if rank:
+        extra = {'select': {'search_rank': rank},
+                 'order_by': ['search_rank', 'id']}
+    return queryset.extra(
+        tables=[table],
+        where=[f'{table}.rowid = {index.table}.id', f'{table} MATCH %s'],
+        params=[match],
+        **extra,
+    )
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по запросу и сортирует их по BM25."""
+    return search_rows(queryset, TITLE_SEARCH, text, TITLE_SEARCH_RANK)
@@ -0,0 +1,155 @@
+from django.db import connections, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from users.models import User
+from .dictionaries import category_dictionary, genre_dictionary
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .search import restore_search_indexes
+from .versions import CATEGORIES, GENRES, TITLES, bump_versions
+
+
+@receiver(post_save, sender=Review)
+def apply_review_score(sender, instance, created, **kwargs):
+    """
+    Переносит оценку сохранённого отзыва в рейтинг произведения.
+
+    Прежние произведение и оценка прочитаны из базы в Review.save,
+    в той же транзакции.
+    """
+    previous = getattr(instance, '_stored_rating', None)
+    current = (instance.title_id, instance.score)
+    if previous is None:
+        Title.update_rating(instance.title_id, instance.score, 1)
+    elif previous[0] != current[0]:
+        Title.update_rating(previous[0], -previous[1], -1)
+        Title.update_rating(instance.title_id, instance.score, 1)
+    elif previous[1] != current[1]:
+        Title.update_rating(instance.title_id, current[1] - previous[1], 0)
+    else:
+        return
+    bump_versions(TITLES)
+
+
+@receiver(post_delete, sender=Review)
+def revert_review_score(sender, instance, **kwargs):
+    """
+    Убирает оценку отзыва, удалённого через Review.delete.
+
+    Оценки отзывов, удалённых QuerySet.delete, вычитает
+    ReviewQuerySet.delete, а удалённых вместе с пользователем —
+    remove_author_scores. Рейтинг удаляемого произведения не нужен.
+    """
+    stored = instance.__dict__.pop('_stored_rating', None)
+    if stored is not None:
+        Title.update_rating(stored[0], -stored[1], -1)
+        bump_versions(TITLES)
+
+
+@receiver(pre_delete, sender=User)
+def remove_author_scores(sender, instance, using, **kwargs):
+    """
+    Вычитает оценки удаляемого пользователя одним UPDATE.
+
+    pre_delete отправляется в транзакции удаления, а сами отзывы
+    потом удаляются каскадом без сдвига рейтинга.
+    """
+    reviews = Review.objects.using(using).filter(author=instance)
+    if not reviews.stored_ratings():
+        return
+    Title.objects.using(using).filter(reviews__author=instance).update(
+        rating_sum=F('rating_sum') - Subquery(
+            reviews.filter(title=OuterRef('pk')).values('score')[:1]
+        ),
+        rating_count=F('rating_count') - 1,
+        modified=timezone.now(),
+    )
+    bump_versions(TITLES)
+
+
+@receiver([post_save, post_delete], sender=Title)
+def invalidate_titles(sender, **kwargs):
+    bump_versions(TITLES)
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def invalidate_title_genres(sender, action, **kwargs):
+    # На post_delete для GenreTitle не подписываемся: иначе связи
+    # при удалении жанра или произведения удалялись бы по одной.
+    if action.startswith('post_'):
+        bump_versions(TITLES)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories(sender, **kwargs):
+    """
+    Категория выводится и в списке произведений. Словарь категорий
+    этого процесса перечитывается сразу после фиксации. Остальные
+    процессы перечитают его, когда увидят новую версию в общем кеше,
+    а с locmem — не позже чем через DICTIONARY_MAX_AGE.
+    """
+    bump_versions(CATEGORIES, TITLES)
+    transaction.on_commit(category_dictionary.get)
+
+
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    """Жанр выводится и в списке произведений."""
+    bump_versions(GENRES, TITLES)
+    transaction.on_commit(genre_dictionary.get)
+
+
+def touch_titles(**lookups):
+    """
+    Обновляет дату изменения произведений, в выводе которых
+    поменялись жанры или категория.
+    """
+    Title.objects.filter(**lookups).update(modified=timezone.now())
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def touch_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove'):
+        touch_titles(**(
+            {'pk__in': pk_set} if reverse else {'pk': instance.pk}
+        ))
+    elif action == 'pre_clear':
+        touch_titles(**(
+            {'genre': instance} if reverse else {'pk': instance.pk}
+        ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def touch_category_titles(sender, instance, created=False, **kwargs):
+    if not created:
+        touch_titles(category_id=instance.pk)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, created=False, **kwargs):
+    # При удалении жанра связи с произведениями удаляются вместе
+    # с ним, поэтому произведения находятся до удаления.
+    if not created:
+        touch_titles(genre=instance)
+
+
+@receiver(post_save, sender=Comment)
+def touch_review(sender, instance, **kwargs):
+    """
+    Комментарии выводятся вместе с отзывом. На post_delete не
+    подписываемся, чтобы комментарии удалялись вместе с отзывом
+    одним запросом; удаление через API обновляет отзыв само.
+    """
+    Review.objects.filter(pk=instance.review_id).update(
+        modified=timezone.now()
+    )
+
+
+def restore_search_index(sender, using, **kwargs):
+    """Возвращает триггеры поиска, если миграция пересоздала таблицу."""
+    restore_search_indexes(connections[using])
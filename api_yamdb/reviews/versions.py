@@ -0,0 +1,51 @@
+"""
+Версии групп ресурсов для кеша ответов API.
+
+Ключ закешированного ответа содержит версию группы, к которой
+относится ресурс. Любое изменение данных группы меняет её версию,
+поэтому старые ответы перестают находиться и вытесняются по
+времени жизни, а удалять их по одному не нужно.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+TITLES = 'titles'
+CATEGORIES = 'categories'
+GENRES = 'genres'
+FAMILIES = (TITLES, CATEGORIES, GENRES)
+
+
+def version_key(family):
+    return f'resource-version:{family}'
+
+
+def get_version(family):
+    """Возвращает текущую версию группы, создавая её при отсутствии."""
+    version = cache.get(version_key(family))
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(version_key(family), version, None):
+            version = cache.get(version_key(family), version)
+    return version
+
+
+def bump_versions(*families):
+    """
+    Меняет версии групп сразу и после фиксации транзакции.
+
+    Второй раз нужен для запросов, которые успели прочитать из базы
+    старые данные между изменением и фиксацией и сохранили ответ
+    с новой версией.
+    """
+    families = families or FAMILIES
+
+    def bump():
+        cache.set_many(
+            {version_key(family): uuid.uuid4().hex for family in families},
+            None,
+        )
+
+    bump()
+    transaction.on_commit(bump)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 class UserAdmin(UserAdmin):
@@ -23,3 +23,14 @@ class UserAdmin(UserAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Административная конфигурация для очереди писем."""
+
+    list_display = (
+        'email', 'subject', 'status', 'attempts', 'send_after', 'sent_at'
+    )
+    list_filter = ('status',)
+    search_fields = ('email',)
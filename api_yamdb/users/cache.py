@@ -0,0 +1,81 @@
+"""
+Кеш пользователей, прошедших JWT-аутентификацию, и версий их прав.
+
+Каждая запись хранится вместе с поколением, с которым она была
+создана. Любое изменение или удаление пользователя меняет поколение,
+поэтому записи, прочитанные из базы до изменения и сохранённые после,
+в кеше уже не совпадут с текущим поколением и не будут использованы.
+
+Без AUTH_USER_CACHE кеш не читается и не пишется: поколение,
+изменённое в памяти одного процесса, другие процессы не увидят.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from api_yamdb.settings import AUTH_USER_CACHE_TIMEOUT
+
+
+def generation_key(user_id):
+    return f'auth-user-generation:{user_id}'
+
+
+def entry_key(kind, user_id):
+    return f'auth-{kind}:{user_id}'
+
+
+def get_cached(kind, user_id):
+    """
+    Возвращает значение из кеша и текущее поколение пользователя.
+
+    Если записи нет или она от другого поколения, значение None;
+    поколение нужно передать в set_cached после чтения из базы.
+    """
+    if not settings.AUTH_USER_CACHE:
+        return None, None
+    values = cache.get_many(
+        [generation_key(user_id), entry_key(kind, user_id)]
+    )
+    generation = values.get(generation_key(user_id))
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(generation_key(user_id), generation, None):
+            generation = cache.get(generation_key(user_id))
+        return None, generation
+    cached = values.get(entry_key(kind, user_id))
+    if cached and cached[0] == generation:
+        return cached[1], generation
+    return None, generation
+
+
+def set_cached(kind, user_id, value, generation):
+    if generation is None:
+        return
+    cache.set(
+        entry_key(kind, user_id), (generation, value),
+        AUTH_USER_CACHE_TIMEOUT
+    )
+
+
+def get_cached_user(user_id):
+    return get_cached('user', user_id)
+
+
+def cache_user(user, generation):
+    set_cached('user', user.pk, user, generation)
+
+
+def invalidate_user(user_id):
+    """
+    Меняет поколение пользователя сразу и после фиксации транзакции.
+
+    Второй раз нужен для запросов, которые успели прочитать из базы
+    старую строку между первым изменением и фиксацией.
+    """
+    def bump():
+        cache.set(generation_key(user_id), uuid.uuid4().hex, None)
+
+    bump()
+    transaction.on_commit(bump)
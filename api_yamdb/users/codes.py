@@ -0,0 +1,103 @@
+"""Короткие одноразовые коды подтверждения с ограниченным сроком действия."""
+import hashlib
+import hmac
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from api_yamdb.settings import (CONFIRMATION_CODE_COOLDOWN,
+                                CONFIRMATION_CODE_LENGTH,
+                                CONFIRMATION_CODE_MAX_ATTEMPTS,
+                                CONFIRMATION_CODE_TTL, SECRET_KEY)
+from .models import ConfirmationCode
+
+# Без похожих друг на друга символов: 0/O, 1/I.
+CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
+
+def hash_code(user_id, code):
+    return hmac.new(
+        SECRET_KEY.encode(),
+        f'{user_id}:{code.strip().upper()}'.encode(),
+        hashlib.sha256,
+    ).hexdigest()
+
+
+def usable(now):
+    """Условие, при котором код ещё можно предъявить."""
+    return Q(
+        expires_at__gt=now,
+        failed_attempts__lt=CONFIRMATION_CODE_MAX_ATTEMPTS,
+    )
+
+
+def issue_code(user):
+    """
+    Выдаёт пользователю новый код и возвращает его.
+
+    Если действующий код выдан меньше CONFIRMATION_CODE_COOLDOWN
+    назад, возвращает None: письмо с ним ещё в пути или уже получено.
+    Других ограничений на повторные письма нет, поэтому каждый
+    выданный код уходит адресату.
+    """
+    now = timezone.now()
+    code = get_random_string(CONFIRMATION_CODE_LENGTH, CODE_ALPHABET)
+    values = {
+        'code_hash': hash_code(user.pk, code),
+        'created': now,
+        'expires_at': now + CONFIRMATION_CODE_TTL,
+        'failed_attempts': 0,
+    }
+    replaced = ConfirmationCode.objects.filter(pk=user.pk).filter(
+        ~usable(now) | Q(created__lte=now - CONFIRMATION_CODE_COOLDOWN)
+    ).update(**values)
+    if replaced:
+        return code
+    try:
+        with transaction.atomic():
+            ConfirmationCode.objects.create(user=user, **values)
+    except IntegrityError:
+        return None
+    return code
+
+
+def verify_code(user, code):
+    """
+    Проверяет и погашает код пользователя.
+
+    Пользователь должен быть загружен с select_related(
+    'confirmation_code'). Код погашается одним DELETE с условием,
+    поэтому при параллельных запросах с верным кодом токен
+    получит только один из них. Неверный код увеличивает счётчик
+    неудачных попыток.
+    """
+    try:
+        stored = user.confirmation_code
+    except ConfirmationCode.DoesNotExist:
+        return False
+    now = timezone.now()
+    if (
+        stored.expires_at <= now
+        or stored.failed_attempts >= CONFIRMATION_CODE_MAX_ATTEMPTS
+    ):
+        return False
+    code_hash = hash_code(user.pk, str(code))
+    if not hmac.compare_digest(stored.code_hash, code_hash):
+        ConfirmationCode.objects.filter(pk=user.pk).update(
+            failed_attempts=F('failed_attempts') + 1
+        )
+        return False
+    deleted, _ = ConfirmationCode.objects.filter(
+        usable(now), pk=user.pk, code_hash=code_hash
+    ).delete()
+    return deleted == 1
+
+
+def purge_codes():
+    """Удаляет просроченные и заблокированные коды одним запросом."""
+    deleted, _ = ConfirmationCode.objects.exclude(
+        usable(timezone.now())
+    ).delete()
+    return deleted
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users.codes import purge_codes
+from users.outbox import purge_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет просроченные и заблокированные коды подтверждения '
+        'и обработанные письма старше EMAIL_OUTBOX_RETENTION.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Удалено кодов: {purge_codes()}')
+        self.stdout.write(f'Удалено писем: {purge_outbox()}')
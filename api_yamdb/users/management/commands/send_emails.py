@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api_yamdb.settings import (EMAIL_OUTBOX_BATCH_SIZE,
+                                EMAIL_OUTBOX_MAX_ATTEMPTS)
+from users.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пакетами, повторяя неудачные '
+        'попытки с увеличивающейся задержкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем на одно соединение с почтовым сервером.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=EMAIL_OUTBOX_MAX_ATTEMPTS
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя очередь каждые --interval с.'
+        )
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            self.deliver(options)
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def deliver(self, options):
+        while True:
+            result = deliver_batch(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+            )
+            if not any(result):
+                return
+            self.stdout.write(
+                f'Отправлено {result.sent}, пропущено {result.suppressed}, '
+                f'ошибок {result.failed}'
+            )
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+from reviews.search import normalize_search_text
+
+
+def fill_username_search(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    users = list(User.objects.only('id', 'username'))
+    for user in users:
+        user.username_search = normalize_search_text(user.username)
+    User.objects.bulk_update(users, ['username_search'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='username_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150, verbose_name='Имя пользователя для поиска'),
+        ),
+        migrations.RunPython(fill_username_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import USER_SEARCH, drop_search_index, ensure_search_index
+
+
+def create_search_index(apps, schema_editor):
+    ensure_search_index(schema_editor.connection, USER_SEARCH)
+
+
+def remove_search_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection, USER_SEARCH)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_outgoing_email_status_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='username_search',
+            field=models.CharField(default='', editable=False, max_length=150, verbose_name='Имя пользователя для поиска'),
+        ),
+    ]
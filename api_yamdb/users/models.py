@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 
 from api_yamdb.settings import FORBIDDEN_SYMBOL
+from reviews.search import normalize_search_text
 
 
 class User(AbstractUser):
@@ -43,6 +45,13 @@ class User(AbstractUser):
         max_length=20, verbose_name='Роль', choices=ROLES, default=USER
     )
     password = models.CharField(max_length=250)
+    username_search = models.CharField(
+        max_length=150, editable=False, default='',
+        verbose_name='Имя пользователя для поиска'
+    )
+    token_version = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Версия прав в токене'
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -52,6 +61,41 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    # Поля, которые попадают в токен и меняют права пользователя.
+    PRIVILEGE_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in cls.PRIVILEGE_FIELDS):
+            instance._privileges = tuple(
+                loaded[field] for field in cls.PRIVILEGE_FIELDS
+            )
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._privileges = tuple(
+            getattr(self, field) for field in self.PRIVILEGE_FIELDS
+        )
+
+    def save(self, *args, **kwargs):
+        self.username_search = normalize_search_text(self.username)
+        privileges = tuple(
+            getattr(self, field) for field in self.PRIVILEGE_FIELDS
+        )
+        if getattr(self, '_privileges', privileges) != privileges:
+            # Токены, выданные до изменения прав, перестают
+            # подтверждать роль без обращения к базе.
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'
+                }
+        super().save(*args, **kwargs)
+        self._privileges = privileges
+
     @property
     def is_admin(self):
         """Проверяет, является ли пользователь администратором."""
@@ -66,3 +110,93 @@ class User(AbstractUser):
     def is_user(self):
         """Проверяет, является ли пользователь модератором."""
         return self.role == self.USER
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+
+    Записывается в той же транзакции, что и изменение данных,
+    а отправляется командой send_emails.
+    """
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    SUPPRESSED = 'suppressed'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'pending'),
+        (SENT, 'sent'),
+        (SUPPRESSED, 'suppressed'),
+        (FAILED, 'failed'),
+    ]
+
+    email = models.EmailField(max_length=254, verbose_name='Адрес')
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    message = models.TextField(verbose_name='Текст')
+    status = models.CharField(
+        max_length=20, verbose_name='Статус', choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки'
+    )
+    last_error = models.TextField(
+        blank=True, verbose_name='Последняя ошибка'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата создания'
+    )
+    send_after = models.DateTimeField(
+        default=timezone.now, verbose_name='Отправить не раньше'
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Дата отправки'
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['status', 'send_after'],
+                name='outgoing_email_queue_idx',
+            ),
+            models.Index(
+                fields=['email', 'status'], name='outgoing_email_status_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.email}: {self.subject}'
+
+
+class ConfirmationCode(models.Model):
+    """
+    Действующий код подтверждения пользователя.
+
+    Хранится только хеш кода; у пользователя не больше одного кода.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='confirmation_code', verbose_name='Пользователь'
+    )
+    code_hash = models.CharField(max_length=64, verbose_name='Хеш кода')
+    created = models.DateTimeField(
+        default=timezone.now, verbose_name='Дата выдачи'
+    )
+    expires_at = models.DateTimeField(
+        db_index=True, verbose_name='Действует до'
+    )
+    failed_attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Неудачных попыток'
+    )
+
+    class Meta:
+        verbose_name = 'Код подтверждения'
+        verbose_name_plural = 'Коды подтверждения'
+
+    def __str__(self):
+        return f'Код подтверждения {self.user_id}'
@@ -0,0 +1,146 @@
+"""Очередь исходящих писем и её отправка пакетами."""
+from collections import namedtuple
+
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from api_yamdb.settings import (EMAIL_OUTBOX_BATCH_SIZE,
+                                EMAIL_OUTBOX_MAX_ATTEMPTS,
+                                EMAIL_OUTBOX_RETENTION,
+                                EMAIL_OUTBOX_RETRY_DELAY, EMAIl_ADRESS)
+from .models import OutgoingEmail
+
+DeliveryResult = namedtuple('DeliveryResult', 'sent suppressed failed')
+
+
+def queue_email(email, subject, message):
+    """
+    Ставит письмо в очередь; вызывается внутри транзакции запроса.
+
+    Ещё не отправленные письма на тот же адрес помечаются как
+    suppressed: новое письмо заменяет их, и адресат не получит,
+    например, код подтверждения, который уже заменён новым.
+    """
+    OutgoingEmail.objects.filter(
+        email=email, status=OutgoingEmail.PENDING
+    ).update(status=OutgoingEmail.SUPPRESSED, message='')
+    return OutgoingEmail.objects.create(
+        email=email, subject=subject, message=message
+    )
+
+
+def claim_batch(now, batch_size):
+    """
+    Забирает пакет писем, готовых к отправке.
+
+    Выбранным письмам сдвигается send_after, и в пакет попадают
+    только те, у которых он сдвинут этим вызовом: письма,
+    забранные другим процессом, повторно не отправляются.
+    """
+    ids = list(OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, send_after__lte=now
+    ).order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    lease = now + EMAIL_OUTBOX_RETRY_DELAY
+    OutgoingEmail.objects.filter(
+        id__in=ids, status=OutgoingEmail.PENDING, send_after__lte=now
+    ).update(send_after=lease)
+    return list(OutgoingEmail.objects.filter(
+        id__in=ids, send_after=lease
+    ).order_by('id'))
+
+
+def deliver_batch(batch_size=EMAIL_OUTBOX_BATCH_SIZE,
+                  max_attempts=EMAIL_OUTBOX_MAX_ATTEMPTS):
+    """
+    Отправляет один пакет писем через одно соединение с почтовым
+    бэкендом и возвращает DeliveryResult.
+
+    Из писем пакета на один адрес отправляется последнее. Неудачная
+    отправка откладывается с удвоением задержки, после max_attempts
+    попыток письмо помечается как failed. Текст отправленных,
+    отменённых и неотправленных писем стирается: в нём может быть
+    код подтверждения.
+    """
+    now = timezone.now()
+    batch = claim_batch(now, batch_size)
+    if not batch:
+        return DeliveryResult(0, 0, 0)
+    seen = set()
+    to_send, suppressed = [], []
+    # От новых писем к старым: из повторов отправляется последнее.
+    for outgoing in reversed(batch):
+        if outgoing.email in seen:
+            suppressed.append(outgoing.id)
+        else:
+            seen.add(outgoing.email)
+            to_send.append(outgoing)
+    to_send.reverse()
+    sent, failed = send_messages(to_send)
+    if sent:
+        OutgoingEmail.objects.filter(id__in=sent).update(
+            status=OutgoingEmail.SENT, sent_at=now, message=''
+        )
+    if suppressed:
+        OutgoingEmail.objects.filter(id__in=suppressed).update(
+            status=OutgoingEmail.SUPPRESSED, message=''
+        )
+    for outgoing in failed:
+        outgoing.attempts += 1
+        outgoing.send_after = now + EMAIL_OUTBOX_RETRY_DELAY * 2 ** (
+            outgoing.attempts - 1
+        )
+        if outgoing.attempts >= max_attempts:
+            outgoing.status = OutgoingEmail.FAILED
+            outgoing.message = ''
+    OutgoingEmail.objects.bulk_update(
+        failed, ['attempts', 'last_error', 'send_after', 'status', 'message']
+    )
+    return DeliveryResult(len(sent), len(suppressed), len(failed))
+
+
+def purge_outbox(retention=EMAIL_OUTBOX_RETENTION):
+    """Удаляет обработанные письма старше retention одним запросом."""
+    deleted, _ = OutgoingEmail.objects.exclude(
+        status=OutgoingEmail.PENDING
+    ).filter(created__lt=timezone.now() - retention).delete()
+    return deleted
+
+
+def send_messages(outgoing_emails):
+    """
+    Отправляет письма через одно соединение с бэкендом.
+
+    Возвращает id отправленных писем и список неотправленных
+    с заполненным last_error.
+    """
+    sent, failed = [], []
+    if not outgoing_emails:
+        return sent, failed
+    try:
+        with get_connection(fail_silently=False) as backend:
+            for outgoing in outgoing_emails:
+                message = EmailMessage(
+                    subject=outgoing.subject,
+                    body=outgoing.message,
+                    from_email=EMAIl_ADRESS,
+                    to=(outgoing.email,),
+                    connection=backend,
+                )
+                try:
+                    backend.send_messages([message])
+                except Exception as error:
+                    outgoing.last_error = repr(error)
+                    failed.append(outgoing)
+                else:
+                    sent.append(outgoing.id)
+    except Exception as error:
+        # Соединение не открылось или оборвалось при закрытии:
+        # неотправленные письма уйдут при следующей попытке.
+        sent_ids = set(sent)
+        for outgoing in outgoing_emails:
+            if outgoing.id not in sent_ids and outgoing not in failed:
+                outgoing.last_error = repr(error)
+                failed.append(outgoing)
+    return sent, failed
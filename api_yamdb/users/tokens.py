@@ -0,0 +1,37 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+
+# Поля пользователя, которых достаточно для проверки прав.
+CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_superuser')
+VERSION_CLAIM = 'ver'
+
+
+class ClaimsAccessToken(AccessToken):
+    """Токен доступа с ролью пользователя и версией его прав."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+def user_from_claims(token):
+    """
+    Собирает несохранённого пользователя из утверждений токена.
+
+    У такого пользователя заполнены только id и поля CLAIM_FIELDS;
+    флаг from_token_claims показывает, что остальные данные нужно
+    читать из базы.
+    """
+    user = User(
+        id=token[api_settings.USER_ID_CLAIM],
+        token_version=token[VERSION_CLAIM],
+        **{field: token[field] for field in CLAIM_FIELDS},
+    )
+    user.from_token_claims = True
+    return user
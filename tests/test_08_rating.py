@@ -0,0 +1,158 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, Title
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Так себе', 1)
+        assert self.get_rating(admin_client, title_id) == 3, (
+            'Проверьте, что после создания отзыва рейтинг произведения '
+            'равен средней оценке всех его отзывов.'
+        )
+
+        admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data={'score': 9}
+        )
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что изменение оценки в отзыве пересчитывает '
+            'рейтинг произведения.'
+        )
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert self.get_rating(admin_client, title_id) == 1, (
+            'Проверьте, что удаление отзыва пересчитывает рейтинг '
+            'произведения.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что при каскадном удалении отзывов вместе с '
+            'пользователем рейтинг произведения пересчитывается.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('recalculate_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'рейтинги произведений по отзывам.'
+        )
+
+    def test_03_stale_instance_does_not_drift(self, admin, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(name='Звезда', year=1990,
+                                     category=category)
+        Review.objects.create(author=admin, title=title, text='a', score=5)
+        Review.objects.create(author=user, title=title, text='b', score=5)
+        first = Review.objects.get(author=admin)
+        second = Review.objects.get(author=admin)
+        first.score = 9
+        first.save()
+        second.score = 1
+        second.save()
+        Review.objects.get(author=user).delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (1, 1), (
+            'Проверьте, что рейтинг сдвигается на разницу с оценкой, '
+            'прочитанной из базы в транзакции изменения, а не с оценкой '
+            'устаревшего объекта.'
+        )
+
+    def test_04_cascade_rebuilds_once(self, admin, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        titles = [
+            Title.objects.create(name=f'Звезда {idx}', year=1990,
+                                 category=category)
+            for idx in range(3)
+        ]
+        for title in titles:
+            Review.objects.create(author=user, title=title, text='a', score=5)
+        Review.objects.create(author=admin, title=titles[0], text='b',
+                              score=3)
+        with CaptureQueriesContext(connection) as queries:
+            user.delete()
+        updates = [
+            query for query in queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(updates) == 1, (
+            'Проверьте, что при каскадном удалении отзывов рейтинги '
+            'произведений обновляются одним запросом.'
+        )
+        assert [
+            (title.rating_sum, title.rating_count)
+            for title in Title.objects.order_by('id')
+        ] == [(3, 1), (0, 0), (0, 0)]
+
+        with CaptureQueriesContext(connection) as queries:
+            titles[0].delete()
+        assert not any(
+            query['sql'].startswith('UPDATE "reviews_title"')
+            for query in queries
+        ), (
+            'Проверьте, что рейтинг удаляемого произведения не '
+            'пересчитывается.'
+        )
+
+    def test_05_incremental_updates(self, admin, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(name='Звезда', year=1990,
+                                     category=category)
+        review = Review.objects.create(
+            author=admin, title=title, text='a', score=5
+        )
+        Review.objects.create(author=user, title=title, text='b', score=7)
+        review.score = 8
+        with CaptureQueriesContext(connection) as queries:
+            review.save()
+        assert not any(
+            'SUM(' in query['sql'] or 'COUNT(' in query['sql']
+            for query in queries
+        ), (
+            'Проверьте, что сохранение отзыва сдвигает рейтинг на разницу '
+            'оценок, а не пересчитывает его по всем отзывам.'
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (15, 2)
+
+        Review.objects.filter(author=user).delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (8, 1), (
+            'Проверьте, что удаление отзывов через QuerySet.delete '
+            'обновляет рейтинг.'
+        )
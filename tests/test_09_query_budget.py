@@ -0,0 +1,95 @@
+import pytest
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from tests.utils import check_query_budget, count_queries
+
+PAGE_SIZE = 10
+
+# Максимальное число SQL-запросов на один GET-запрос администратора,
+# включая запрос пользователя при аутентификации, пока он не в кеше.
+QUERY_BUDGETS = {
+    '/api/v1/titles/': 4,
+    '/api/v1/titles/{title_id}/': 3,
+    '/api/v1/titles/{title_id}/reviews/': 4,
+    '/api/v1/titles/{title_id}/reviews/?expand=comments': 5,
+    '/api/v1/titles/{title_id}/reviews/{review_id}/': 2,
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/': 4,
+    '/api/v1/categories/': 3,
+    '/api/v1/genres/': 3,
+    '/api/v1/users/': 3,
+}
+
+
+def fill_database(django_user_model, size, prefix='a'):
+    category = Category.objects.create(name='Фильм', slug=f'{prefix}-movie')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'{prefix}-genre-{idx}')
+        for idx in range(size)
+    ]
+    Category.objects.bulk_create(
+        Category(name=f'Категория {idx}', slug=f'{prefix}-category-{idx}')
+        for idx in range(size)
+    )
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'{prefix}-author-{idx}',
+            email=f'{prefix}-author-{idx}@yamdb.fake'
+        )
+        for idx in range(size)
+    ]
+    titles = []
+    for idx in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres[:2])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            author=author, title=titles[0], text='Отзыв', score=5
+        )
+        for author in authors
+    ]
+    for author in authors:
+        Comment.objects.create(
+            author=author, review=reviews[0], text='Комментарий'
+        )
+    return titles[0], reviews[0]
+
+
+def build_urls(title, review):
+    return {
+        budget_url: budget_url.format(title_id=title.id, review_id=review.id)
+        for budget_url in QUERY_BUDGETS
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    @pytest.mark.parametrize('budget_url', QUERY_BUDGETS)
+    def test_01_query_budget(self, admin_client, django_user_model,
+                             budget_url):
+        title, review = fill_database(django_user_model, PAGE_SIZE)
+        url = build_urls(title, review)[budget_url]
+        check_query_budget(admin_client, url, QUERY_BUDGETS[budget_url])
+
+    @pytest.mark.parametrize('budget_url', QUERY_BUDGETS)
+    def test_02_queries_do_not_grow_with_page(self, admin_client,
+                                              django_user_model, budget_url):
+        # Пользователь кешируется при первом запросе, поэтому оба
+        # замера делаются после него.
+        admin_client.get('/api/v1/users/me/')
+        title, review = fill_database(django_user_model, 1)
+        small = count_queries(
+            admin_client, build_urls(title, review)[budget_url]
+        )
+        title, review = fill_database(django_user_model, PAGE_SIZE, 'b')
+        large = count_queries(
+            admin_client, build_urls(title, review)[budget_url]
+        )
+        assert small == large, (
+            f'Проверьте, что количество SQL-запросов к `{budget_url}` не '
+            f'зависит от размера страницы: {small} запросов для одного '
+            f'объекта и {large} для полной страницы.'
+        )
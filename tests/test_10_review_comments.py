@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb.settings import EXPANDED_COMMENTS_LIMIT
+from reviews.models import Comment, Review
+from tests.utils import (create_comments, create_reviews,
+                         create_single_comment)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ReviewComments:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_comments_count(self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert response.status_code == HTTPStatus.OK
+        results = {
+            review['id']: review for review in response.json()['results']
+        }
+        assert results[reviews[0]['id']]['comments_count'] == len(comments), (
+            f'Проверьте, что ответ на GET-запрос к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` содержит количество комментариев '
+            'к отзыву в поле `comments_count`.'
+        )
+        assert results[reviews[1]['id']]['comments_count'] == 0
+        assert 'comments' not in results[reviews[0]['id']], (
+            'Проверьте, что без параметра `expand=comments` комментарии '
+            'не включаются в ответ со списком отзывов.'
+        )
+
+    def test_02_expand_comments(self, admin_client, admin):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        for idx in range(EXPANDED_COMMENTS_LIMIT + 1):
+            create_single_comment(
+                admin_client, titles[0]['id'], reviews[0]['id'], str(idx)
+            )
+        response = admin_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            + '?expand=comments'
+        )
+        review = response.json()['results'][0]
+        assert review['comments_count'] == EXPANDED_COMMENTS_LIMIT + 2
+        assert len(review['comments']) == EXPANDED_COMMENTS_LIMIT, (
+            'Проверьте, что при GET-запросе с параметром `expand=comments` '
+            'для каждого отзыва возвращаются только первые '
+            f'{EXPANDED_COMMENTS_LIMIT} комментария.'
+        )
+        assert review['comments'][0]['text'] == 'comment number 1'
+
+    def test_03_review_from_other_title(self, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        )
+        assert_msg = (
+            f'Проверьте, что запрос к `{self.COMMENTS_URL_TEMPLATE}` с '
+            'отзывом, который относится к другому произведению, возвращает '
+            'ответ со статусом 404.'
+        )
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, assert_msg
+        response = admin_client.post(url, data={'text': 'Мимо'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, assert_msg
+        response = admin_client.get(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, assert_msg
+
+    def test_04_expand_takes_first_comments_per_review(self, admin_client,
+                                                       admin, user_client,
+                                                       user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews = list(Review.objects.filter(title_id=titles[0]['id']))
+        Comment.objects.bulk_create(
+            Comment(author=admin, review=review, text=f'{review.id}-{idx}')
+            for idx in range(50) for review in reviews
+        )
+        response = admin_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            + '?expand=comments'
+        )
+        for review in response.json()['results']:
+            assert [comment['text'] for comment in review['comments']] == [
+                f'{review["id"]}-{idx}'
+                for idx in range(EXPANDED_COMMENTS_LIMIT)
+            ], (
+                'Проверьте, что при `expand=comments` каждый отзыв получает '
+                'свои первые комментарии.'
+            )
+        review_url = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            + f'{reviews[1].id}/?expand=comments'
+        )
+        comments = admin_client.get(review_url).json()['comments']
+        assert len(comments) == EXPANDED_COMMENTS_LIMIT
+        response = admin_client.patch(review_url, data={'text': 'Новый'})
+        assert len(response.json()['comments']) == EXPANDED_COMMENTS_LIMIT, (
+            'Проверьте, что при `expand=comments` ответ на изменение отзыва '
+            'тоже содержит его первые комментарии.'
+        )
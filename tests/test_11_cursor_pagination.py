@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, Title
+
+PAGE_SIZE = 10
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    USERS_URL = '/api/v1/users/'
+
+    def collect_pages(self, client, url):
+        results = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert not any(
+                '"__count"' in query['sql']
+                for query in context.captured_queries
+            ), (
+                f'Проверьте, что пагинация по курсору для `{url}` не '
+                'выполняет запрос COUNT(*).'
+            )
+            data = response.json()
+            assert 'count' not in data
+            results.extend(data['results'])
+            url = data['next']
+        return results
+
+    def test_01_reviews_cursor(self, client, admin_client, django_user_model):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=category
+        )
+        for idx in range(PAGE_SIZE + 2):
+            author = django_user_model.objects.create_user(
+                username=f'author-{idx}', email=f'author-{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                author=author, title=title, text='Отзыв', score=5
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+
+        results = self.collect_pages(client, f'{url}?pagination=cursor')
+        expected = list(
+            Review.objects.filter(title=title).values_list('id', flat=True)
+        )
+        assert [review['id'] for review in results] == expected, (
+            f'Проверьте, что пагинация по курсору для `{url}` возвращает '
+            'все отзывы по порядку id без пропусков и повторов.'
+        )
+
+        response = client.get(url)
+        assert response.json()['count'] == PAGE_SIZE + 2, (
+            f'Проверьте, что без параметра `pagination=cursor` эндпоинт '
+            f'`{url}` по-прежнему возвращает постраничный ответ с `count`.'
+        )
+
+    def test_02_users_cursor(self, admin_client, django_user_model):
+        for idx in range(PAGE_SIZE + 2):
+            django_user_model.objects.create_user(
+                username=f'user-{idx}', email=f'user-{idx}@yamdb.fake'
+            )
+        results = self.collect_pages(
+            admin_client, f'{self.USERS_URL}?pagination=cursor'
+        )
+        assert len(results) == PAGE_SIZE + 3
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_prefix_and_rank(self, client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Title.objects.create(
+            name='Крестный отец', year=1972, category=category,
+            description='Семейная сага о мафии'
+        )
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994, category=category,
+            description='Побег, тюрьма и надежда'
+        )
+        Title.objects.create(
+            name='Зелёная миля', year=1999, category=category,
+            description='История о тюрьме и чуде'
+        )
+        assert self.search(client, 'шоу') == ['Побег из Шоушенка'], (
+            f'Проверьте, что поиск в `{self.TITLES_URL}` находит '
+            'произведения по началу слова без учёта регистра.'
+        )
+        assert self.search(client, 'побег тюрьма') == ['Побег из Шоушенка']
+        assert self.search(client, 'мафия OR') == []
+        assert self.search(client, 'побег')[0] == 'Побег из Шоушенка', (
+            f'Проверьте, что результаты поиска в `{self.TITLES_URL}` '
+            'отсортированы по релевантности.'
+        )
+        assert self.search(client, 'тюрьм') == [
+            'Побег из Шоушенка', 'Зелёная миля'
+        ]
+
+    def test_02_index_follows_changes(self, client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(
+            name='Терминатор', year=1984, category=category
+        )
+        assert self.search(client, 'термин') == ['Терминатор']
+        title.name = 'Чужой'
+        title.save()
+        assert self.search(client, 'термин') == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        assert self.search(client, 'чуж') == ['Чужой']
+        title.delete()
+        assert self.search(client, 'чуж') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
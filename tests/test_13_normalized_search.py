@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13NormalizedSearch:
+
+    def search(self, client, url, text):
+        response = client.get(url, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['results']
+
+    @pytest.mark.parametrize('model,url', (
+        (Category, '/api/v1/categories/'),
+        (Genre, '/api/v1/genres/'),
+    ))
+    def test_01_cyrillic_case_insensitive(self, client, model, url):
+        model.objects.create(name='Ёлочные Игрушки', slug='toys')
+        model.objects.create(name='Драма', slug='drama')
+        for text in ('ёлочные игрушки', 'ЕЛОЧ', 'Ёлочные  игр'):
+            results = self.search(client, url, text)
+            assert [obj['slug'] for obj in results] == ['toys'], (
+                f'Проверьте, что поиск в `{url}` не зависит от регистра '
+                f'кириллицы: запрос `{text}` не нашёл `Ёлочные Игрушки`.'
+            )
+
+    def test_02_users_search(self, admin_client, django_user_model):
+        django_user_model.objects.create_user(
+            username='Пользователь', email='cyrillic@yamdb.fake'
+        )
+        results = self.search(admin_client, '/api/v1/users/', 'пользов')
+        assert [user['username'] for user in results] == ['Пользователь']
+
+    def test_03_search_uses_index(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        with CaptureQueriesContext(connection) as queries:
+            self.search(client, '/api/v1/genres/', 'др')
+        sql = next(
+            query['sql'] for query in queries
+            if 'reviews_genre_fts' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert 'VIRTUAL TABLE INDEX' in plan, (
+            'Проверьте, что поиск по нормализованному полю идёт через '
+            f'FTS5-индекс. План запроса: {plan}'
+        )
+
+    @pytest.mark.parametrize('model,url', (
+        (Category, '/api/v1/categories/'),
+        (Genre, '/api/v1/genres/'),
+    ))
+    def test_04_word_prefix(self, client, model, url):
+        model.objects.create(name='Художественный фильм', slug='feature')
+        model.objects.create(name='Фильмография', slug='filmography')
+        model.objects.create(name='Мультфильм', slug='cartoon')
+        results = self.search(client, url, 'фильм')
+        assert [obj['slug'] for obj in results] == [
+            'feature', 'filmography'
+        ], (
+            f'Проверьте, что поиск в `{url}` находит слово в середине '
+            'названия: запрос `фильм` должен найти `Художественный фильм`.'
+        )
+        obj = model.objects.get(slug='feature')
+        obj.name = 'Документальное кино'
+        obj.save()
+        assert [
+            obj['slug'] for obj in self.search(client, url, 'кино')
+        ] == ['feature']
+        assert [
+            obj['slug'] for obj in self.search(client, url, 'худож')
+        ] == []
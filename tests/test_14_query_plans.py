@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.test_09_query_budget import fill_database
+
+# Эндпоинт и таблица, которую его основной запрос должен читать по индексу.
+INDEXED_ENDPOINTS = (
+    ('/api/v1/titles/{title_id}/', 'reviews_title'),
+    ('/api/v1/titles/?category=a-movie&year=2000', 'reviews_title'),
+    ('/api/v1/titles/?genre=a-genre-1', 'reviews_title_genre'),
+    ('/api/v1/titles/{title_id}/reviews/', 'reviews_review'),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/', 'reviews_review'),
+    (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        'reviews_comment'
+    ),
+    (
+        '/api/v1/titles/{title_id}/reviews/?expand=comments',
+        'reviews_comment'
+    ),
+    ('/api/v1/categories/?search=кат', 'reviews_category'),
+    ('/api/v1/genres/?search=жан', 'reviews_genre'),
+    ('/api/v1/users/?search=a-auth', 'users_user'),
+)
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def check_plans(queries, table, url):
+    plans = [
+        explain(query['sql']) for query in queries
+        if f'"{table}"' in query['sql']
+    ]
+    assert plans, f'Запрос к таблице `{table}` для `{url}` не найден.'
+    for plan in plans:
+        for step in plan:
+            # SCAN (subquery-N) читает результат подзапроса, а не таблицу.
+            assert not step.startswith(('SCAN', 'SEARCH')) or (
+                'INDEX' in step or 'PRIMARY KEY' in step
+                or step.startswith('SCAN (subquery-')
+            ), (
+                f'Проверьте, что основной запрос `{url}` читает таблицу '
+                f'`{table}` по индексу. План запроса: {plan}'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14QueryPlans:
+
+    @pytest.mark.parametrize('url_template,table', INDEXED_ENDPOINTS)
+    def test_01_endpoint_uses_index(self, admin_client, django_user_model,
+                                    url_template, table):
+        title, review = fill_database(django_user_model, 3)
+        url = url_template.format(title_id=title.id, review_id=review.id)
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(url)
+        check_plans(context.captured_queries, table, url)
+
+    def test_02_review_uniqueness_without_probe(self, admin_client, admin,
+                                                django_user_model):
+        title, _ = fill_database(django_user_model, 3)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                url, data={'text': 'Ещё отзыв', 'score': 5}
+            )
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': [
+                'Ваш отзыв на это произведение уже опубликован'
+            ]
+        }
+        probes = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"reviews_review"' in query['sql']
+        ]
+        assert not probes, (
+            'Проверьте, что повторный отзыв отклоняется уникальным '
+            'ограничением базы без отдельного запроса на проверку.'
+        )
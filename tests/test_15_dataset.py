@@ -0,0 +1,271 @@
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Genre, GenreTitle, Review, Title
+from tests.conftest import MANAGE_PATH
+from tests.test_21_stateless_auth import claims_client
+from users.models import User
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_PATH, filename), encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Dataset:
+
+    def test_01_import_csv(self, client, django_user_model):
+        call_command('import_csv', batch_size=7, transaction_size=20)
+
+        for model, filename in (
+            (django_user_model, 'users.csv'),
+            (Genre, 'genre.csv'),
+            (Title, 'titles.csv'),
+            (GenreTitle, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что команда `import_csv` загружает все строки '
+                f'файла `{filename}`.'
+            )
+
+        review = Review.objects.get(pk=1)
+        assert (review.title_id, review.author_id) == (1, 100)
+        assert review.pub_date.isoformat() == '2019-09-24', (
+            'Проверьте, что команда `import_csv` сохраняет даты публикации '
+            'из файла.'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки отзывов рейтинги произведений '
+            'пересчитываются.'
+        )
+        response = client.get('/api/v1/titles/', {'search': 'шоушенк'})
+        assert response.json()['count'] == 1
+
+    def test_02_incremental_import(self, tmp_path):
+        data_path = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data_path)
+        call_command('import_csv', path=str(data_path), workers=1)
+
+        review_file = data_path / 'review.csv'
+        content = review_file.read_text(encoding='utf-8')
+        review_file.write_text(
+            content.replace(',100,10,2019-09-24', ',100,1,2019-09-24', 1),
+            encoding='utf-8'
+        )
+        output = io.StringIO()
+        call_command(
+            'import_csv', path=str(data_path), workers=1, incremental=True,
+            stdout=output
+        )
+        assert 'изменено 1,' in output.getvalue(), (
+            'Проверьте, что в режиме `--incremental` команда `import_csv` '
+            'обновляет только изменившиеся строки.'
+        )
+        assert Review.objects.get(pk=1).score == 1
+        title = Title.objects.get(pk=1)
+        assert title.rating_sum == sum(
+            title.reviews.values_list('score', flat=True)
+        ), (
+            'Проверьте, что после инкрементальной загрузки рейтинг '
+            'затронутых произведений пересчитывается.'
+        )
+
+    def test_03_export_dataset(self, tmp_path):
+        call_command('import_csv', workers=1)
+        call_command(
+            'export_dataset', str(tmp_path), stdout=io.StringIO()
+        )
+        for table in ('users', 'category', 'titles', 'genre_title'):
+            filename = f'{table}.csv'
+            with open(tmp_path / filename, encoding='utf-8') as export_file:
+                exported = list(csv.reader(export_file))
+            with open(os.path.join(DATA_PATH, filename),
+                      encoding='utf-8-sig') as source_file:
+                assert exported == list(csv.reader(source_file)), (
+                    f'Проверьте, что команда `export_dataset` выгружает '
+                    f'`{filename}` в формате static/data.'
+                )
+
+        call_command(
+            'export_dataset', str(tmp_path), tables=['review'],
+            export_format='jsonl', gzip=True, chunk_size=5,
+            date_from='2019-09-24', date_to='2019-09-24',
+            stdout=io.StringIO()
+        )
+        with gzip.open(tmp_path / 'review.jsonl.gz', 'rt') as export_file:
+            rows = [json.loads(line) for line in export_file]
+        assert rows and {row['pub_date'] for row in rows} == {
+            '2019-09-24'
+        }, (
+            'Проверьте, что `export_dataset` фильтрует отзывы по датам '
+            'и сжимает выгрузку.'
+        )
+
+    def test_04_export_endpoint(self, admin_client, user_client):
+        call_command('import_csv', workers=1)
+        url = '/api/v1/export/titles/'
+        assert user_client.get(url).status_code == 403, (
+            'Проверьте, что выгрузка данных доступна только администратору.'
+        )
+        assert admin_client.get('/api/v1/export/unknown/').status_code == 404
+
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        content = b''.join(response.streaming_content).decode()
+        assert content.count('\n') == count_rows('titles.csv') + 1
+
+        response = admin_client.get(
+            url, {'output': 'jsonl', 'gzip': 'true', 'category': 'book'}
+        )
+        assert response['Content-Disposition'] == (
+            'attachment; filename="titles.jsonl.gz"'
+        )
+        rows = [
+            json.loads(line) for line in gzip.decompress(
+                b''.join(response.streaming_content)
+            ).decode().splitlines()
+        ]
+        books = Title.objects.filter(category__slug='book').count()
+        assert rows and len(rows) == books, (
+            'Проверьте, что выгрузку можно отфильтровать по категории.'
+        )
+
+    def test_05_generate_dataset(self, tmp_path):
+        options = {
+            'users': 30, 'categories': 2, 'genres': 4, 'titles': 20,
+            'reviews': 200, 'comments_per_review': 1.0, 'seed': 7,
+            'stdout': io.StringIO(),
+        }
+        for directory in ('a', 'b'):
+            call_command(
+                'generate_dataset', output=str(tmp_path / directory),
+                **options
+            )
+        for filename in os.listdir(tmp_path / 'a'):
+            assert (tmp_path / 'a' / filename).read_bytes() == (
+                tmp_path / 'b' / filename
+            ).read_bytes(), (
+                'Проверьте, что `generate_dataset` с одинаковым seed '
+                'генерирует одинаковые данные.'
+            )
+
+        call_command('generate_dataset', **options)
+        assert Review.objects.count() == 200
+        per_title = sorted(
+            Title.objects.values_list('rating_count', flat=True),
+            reverse=True
+        )
+        assert sum(per_title) == 200 and per_title[0] > 3 * per_title[-1], (
+            'Проверьте, что отзывы распределяются по произведениям '
+            'неравномерно.'
+        )
+        assert Comment.objects.exists()
+
+        output = io.StringIO()
+        call_command(
+            'import_csv', path=str(tmp_path / 'a'), workers=1,
+            incremental=True, stdout=output
+        )
+        assert 'изменено 0,' in output.getvalue().splitlines()[-1], (
+            'Проверьте, что файлы `generate_dataset` совпадают с данными, '
+            'которые команда записывает в базу.'
+        )
+
+    def test_06_parallel_import_file_database(self, tmp_path):
+        data_path = tmp_path / 'data'
+        call_command(
+            'generate_dataset', output=str(data_path), users=2000,
+            categories=500, genres=500, titles=1000, reviews=3000,
+            comments_per_review=1.0, seed=3, stdout=io.StringIO()
+        )
+        database = tmp_path / 'db.sqlite3'
+        (tmp_path / 'file_database_settings.py').write_text(
+            'from api_yamdb.settings import *  # noqa\n'
+            'DATABASES = {"default": {'
+            '"ENGINE": "django.db.backends.sqlite3", '
+            f'"NAME": {str(database)!r}}}}}\n'
+        )
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'file_database_settings',
+            'PYTHONPATH': os.pathsep.join((str(tmp_path), MANAGE_PATH)),
+        }
+        import_command = [
+            'import_csv', '--path', str(data_path), '--workers', '3',
+            '--batch-size', '100', '--transaction-size', '500',
+        ]
+        outputs = [
+            subprocess.run(
+                [sys.executable, 'manage.py', *command], cwd=MANAGE_PATH,
+                env=env, capture_output=True, text=True
+            )
+            for command in (
+                ['migrate'], import_command,
+                import_command + ['--incremental'],
+            )
+        ]
+        for output in outputs:
+            assert output.returncode == 0, (
+                'Проверьте, что `import_csv --workers 3` загружает данные '
+                f'в файловую базу SQLite без ошибок: {output.stderr}'
+            )
+        with sqlite3.connect(database) as db:
+            for table, filename in (
+                ('users_user', 'users.csv'),
+                ('reviews_category', 'category.csv'),
+                ('reviews_review', 'review.csv'),
+                ('reviews_comment', 'comments.csv'),
+            ):
+                with open(data_path / filename, encoding='utf-8') as file:
+                    rows = sum(1 for _ in csv.DictReader(file))
+                count, = db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()
+                assert count == rows
+        assert 'изменено 0,' in outputs[2].stdout.splitlines()[-1]
+
+    def test_07_incremental_role_change(self, tmp_path, settings):
+        settings.AUTH_USER_CACHE = True
+        settings.AUTH_STATELESS = True
+        data_path = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data_path)
+        call_command('import_csv', path=str(data_path), workers=1)
+        client = claims_client(User.objects.get(username='capt_obvious'))
+        assert client.get('/api/v1/users/').status_code == 200
+
+        users_file = data_path / 'users.csv'
+        content = users_file.read_text(encoding='utf-8')
+        users_file.write_text(
+            content.replace(
+                'capt_obvious@yamdb.fake,admin', 'capt_obvious@yamdb.fake,user'
+            ).replace(
+                'bingobongo@yamdb.fake,user,', 'bingobongo@yamdb.fake,user,Био'
+            ),
+            encoding='utf-8'
+        )
+        call_command(
+            'import_csv', path=str(data_path), workers=1, incremental=True,
+            stdout=io.StringIO()
+        )
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что после инкрементальной загрузки старая роль '
+            'пользователя не подтверждается ни токеном, ни кешем.'
+        )
+        assert User.objects.get(username='bingobongo').token_version == 0
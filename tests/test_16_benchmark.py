@@ -0,0 +1,87 @@
+import pytest
+
+from api.benchmark import (compare, get_scenarios, prepare_dataset,
+                           run_benchmark)
+from api.microbenchmark import run_microbenchmarks
+from api.urls import auth_urls_v1, router_v1, urlpatterns
+from reviews.generator import DatasetSize
+
+SIZE = DatasetSize(
+    users=20, categories=2, genres=3, titles=10, reviews=60,
+    comments_per_review=1.0,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Benchmark:
+
+    def test_01_all_routes(self):
+        objects = prepare_dataset(SIZE)
+        routes = {
+            pattern.name
+            for pattern in [*router_v1.urls, *auth_urls_v1, *urlpatterns]
+            if getattr(pattern, 'name', None)
+        } - {'api-root'}
+        assert routes == {
+            scenario.route for scenario in get_scenarios(objects)
+        }, 'Проверьте, что бенчмарк вызывает все маршруты `api/urls.py`.'
+
+        results = run_benchmark(objects, iterations=3, warmup=0)
+        for name, metrics in results.items():
+            assert 200 <= metrics['status'] < 300, (
+                f'Сценарий бенчмарка `{name}` вернул {metrics["status"]}.'
+            )
+            assert metrics['p50_ms'] <= metrics['p95_ms']
+        assert results['titles']['queries'] == 0
+        assert results['titles uncached']['queries'] > 0, (
+            'Проверьте, что кешируемые списки замеряются и без кеша.'
+        )
+
+    def test_02_compare(self):
+        baseline = {'1k': {'titles': {
+            'status': 200, 'p50_ms': 10, 'p95_ms': 20, 'queries': 3,
+            'peak_kb': 100,
+        }}}
+        results = {'1k': {'titles': {
+            'status': 200, 'iterations': 20, 'p50_ms': 11, 'p95_ms': 30,
+            'queries': 4, 'peak_kb': 100,
+        }, 'genres': {
+            'status': 200, 'iterations': 20, 'p50_ms': 1, 'p95_ms': 1,
+            'queries': 1, 'peak_kb': 1,
+        }}}
+        regressions = compare(results, baseline, threshold=20)
+        assert len(regressions) == 2, (
+            'Проверьте, что сравнение с эталоном отмечает рост числа '
+            'запросов и времени сверх порога.'
+        )
+        assert compare(results, baseline, threshold=60) == [
+            regressions[0]
+        ]
+
+        results['1k']['titles'].update(iterations=5, queries=3)
+        assert compare(results, baseline, threshold=20) == [], (
+            'Проверьте, что p95 по малому числу замеров не сравнивается '
+            'с эталоном.'
+        )
+        results['1k']['titles']['status'] = 500
+        assert compare(results, baseline, threshold=20) == [
+            '1k titles: статус 500 вместо 200'
+        ], 'Проверьте, что сравнение с эталоном отмечает смену статуса.'
+
+    def test_03_microbenchmarks(self):
+        prepare_dataset(SIZE)
+        results = run_microbenchmarks(objects=5, repeat=1)
+        for name in (
+            'TitleGetSerializer', 'ReviewSerializer', 'CommentSerializer',
+            'UserSerializer',
+        ):
+            assert results[name]['objects'] == 5
+            assert results[name]['serialize_queries'] == 0, (
+                f'Проверьте, что `{name}` не выполняет запросов к базе '
+                f'при сериализации подготовленной выборки.'
+            )
+        for name in (
+            'IsAdminOrModeratorOrOwnerOrReadOnly', 'IsAdminOrReadOnly',
+            'IsSuperUserOrIsAdmin', 'GenreCategorySlugFilter',
+        ):
+            assert results[name]['total_ms'] >= 0
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import ConfirmationCode, OutgoingEmail
+from users.outbox import purge_outbox, queue_email
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise SMTPException('Сервер недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Outbox:
+
+    def test_01_signup_queues_email(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_17_outbox.FailingBackend'
+        data = {'email': 'outbox@yamdb.fake', 'username': 'outbox'}
+        response = client.post(URL_SIGNUP, data=data)
+        assert response.status_code == 200, (
+            'Проверьте, что регистрация не зависит от доступности '
+            'почтового сервера.'
+        )
+        assert not mail.outbox
+        outgoing = OutgoingEmail.objects.get()
+        assert outgoing.email == data['email']
+        assert outgoing.status == OutgoingEmail.PENDING
+
+    def test_02_batch_uses_one_connection(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_17_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        for number in range(5):
+            client.post(URL_SIGNUP, data={
+                'email': f'batch{number}@yamdb.fake',
+                'username': f'batch{number}',
+            })
+        call_command('send_emails')
+        assert len(mail.outbox) == 5
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что письма одного пакета отправляются через одно '
+            'соединение с почтовым бэкендом.'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
+
+    def test_03_newest_pending_wins(self):
+        queue_email('repeat@yamdb.fake', 'Тема', 'Первое')
+        queue_email('repeat@yamdb.fake', 'Тема', 'Второе')
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что из неотправленных писем на один адрес '
+            'отправляется одно.'
+        )
+        assert mail.outbox[0].body == 'Второе', (
+            'Проверьте, что из неотправленных писем на один адрес '
+            'отправляется последнее.'
+        )
+        assert OutgoingEmail.objects.filter(
+            status=OutgoingEmail.SUPPRESSED
+        ).count() == 1
+        assert not OutgoingEmail.objects.exclude(message='').exists(), (
+            'Проверьте, что текст обработанных писем не хранится.'
+        )
+
+    def test_04_retry_with_backoff(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_17_outbox.FailingBackend'
+        client.post(URL_SIGNUP, data={
+            'email': 'retry@yamdb.fake', 'username': 'retry'
+        })
+        call_command('send_emails', max_attempts=2)
+        outgoing = OutgoingEmail.objects.get()
+        assert outgoing.status == OutgoingEmail.PENDING
+        assert outgoing.attempts == 1
+        assert 'Сервер недоступен' in outgoing.last_error
+        first_delay = outgoing.send_after - timezone.now()
+        assert first_delay > timedelta(seconds=30), (
+            'Проверьте, что неудачная отправка откладывается.'
+        )
+
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_emails', max_attempts=2)
+        outgoing.refresh_from_db()
+        assert outgoing.attempts == 2
+        assert outgoing.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после исчерпания попыток письмо помечается '
+            'как неотправленное.'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_emails')
+        assert not mail.outbox
+
+    def test_05_resignup_after_failed_delivery(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_17_outbox.FailingBackend'
+        data = {'email': 'again@yamdb.fake', 'username': 'again'}
+        client.post(URL_SIGNUP, data=data)
+        call_command('send_emails')
+        ConfirmationCode.objects.update(
+            created=timezone.now() - timedelta(hours=1)
+        )
+        client.post(URL_SIGNUP, data=data)
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что письмо с заменённым кодом не отправляется.'
+        )
+        code = mail.outbox[0].body.rsplit(' ', 1)[1]
+        response = client.post(URL_TOKEN, data={
+            'username': 'again', 'confirmation_code': code
+        })
+        assert response.status_code == 200, (
+            'Проверьте, что отправляется письмо с действующим кодом.'
+        )
+
+    def test_06_purge(self):
+        queue_email('old@yamdb.fake', 'Тема', 'Старое')
+        call_command('send_emails')
+        queue_email('old@yamdb.fake', 'Тема', 'Новое')
+        assert purge_outbox() == 0
+        OutgoingEmail.objects.update(
+            created=timezone.now() - timedelta(days=30)
+        )
+        assert purge_outbox() == 1, (
+            'Проверьте, что удаляются только обработанные письма.'
+        )
+        assert OutgoingEmail.objects.get().status == OutgoingEmail.PENDING
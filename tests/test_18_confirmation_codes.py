@@ -0,0 +1,86 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api_yamdb.settings import CONFIRMATION_CODE_MAX_ATTEMPTS
+from users.codes import issue_code, purge_codes
+from users.models import ConfirmationCode
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+
+
+def signup(client, username):
+    client.post(URL_SIGNUP, data={
+        'email': f'{username}@yamdb.fake', 'username': username
+    })
+    call_command('send_emails')
+    return re.search(r': (\w+)$', mail.outbox[-1].body).group(1)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConfirmationCodes:
+
+    def test_01_code_is_consumed(self, client):
+        code = signup(client, 'coder')
+        assert not ConfirmationCode.objects.filter(code_hash=code).exists(), (
+            'Проверьте, что код подтверждения хранится в виде хеша.'
+        )
+        data = {'username': 'coder', 'confirmation_code': code}
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(URL_TOKEN, data=data)
+        assert response.status_code == 200
+        assert 'token' in response.json()
+        selects = [
+            query for query in queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert len(selects) == 1, (
+            'Проверьте, что пользователь и код подтверждения загружаются '
+            'одним запросом.'
+        )
+        response = client.post(URL_TOKEN, data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения можно использовать один раз.'
+        )
+
+    def test_02_failed_attempts(self, client):
+        code = signup(client, 'guesser')
+        for _ in range(CONFIRMATION_CODE_MAX_ATTEMPTS):
+            response = client.post(URL_TOKEN, data={
+                'username': 'guesser', 'confirmation_code': 'WRONG'
+            })
+            assert response.status_code == 400
+        response = client.post(URL_TOKEN, data={
+            'username': 'guesser', 'confirmation_code': code
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что после исчерпания попыток код не принимается.'
+        )
+        assert purge_codes() == 1
+
+    def test_03_cooldown_and_expiry(self, client, django_user_model):
+        code = signup(client, 'waiter')
+        user = django_user_model.objects.get(username='waiter')
+        assert issue_code(user) is None, (
+            'Проверьте, что новый код не выдаётся, пока письмо с '
+            'предыдущим могло ещё не дойти.'
+        )
+        ConfirmationCode.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        response = client.post(URL_TOKEN, data={
+            'username': 'waiter', 'confirmation_code': code
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что просроченный код не принимается.'
+        )
+        new_code = issue_code(user)
+        assert new_code and new_code != code
+        assert purge_codes() == 0
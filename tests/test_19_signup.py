@@ -0,0 +1,63 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from api.serializers import UserCreateSerializer
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Signup:
+
+    def test_01_single_lookup(self, client):
+        data = {'email': 'single@yamdb.fake', 'username': 'single'}
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(URL_SIGNUP, data=data)
+            assert response.status_code == 200
+            user_selects = [
+                query for query in queries
+                if query['sql'].startswith('SELECT')
+                and 'FROM "users_user"' in query['sql']
+            ]
+            assert len(user_selects) == 1, (
+                'Проверьте, что регистрация проверяет username и email '
+                'одним запросом.'
+            )
+
+    def test_02_conflicts(self, client, django_user_model):
+        django_user_model.objects.create(username='first', email='a@x.fake')
+        django_user_model.objects.create(username='second', email='b@x.fake')
+        response = client.post(URL_SIGNUP, data={
+            'username': 'first', 'email': 'b@x.fake'
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что username и email разных пользователей '
+            'не принимаются при регистрации.'
+        )
+        assert len(response.json()['non_field_errors']) == 2
+
+    def test_03_concurrent_signup(self, django_user_model):
+        serializer = UserCreateSerializer(data={
+            'username': 'racer', 'email': 'racer@x.fake'
+        })
+        assert serializer.is_valid()
+        winner = django_user_model.objects.create(
+            username='racer', email='racer@x.fake'
+        )
+        assert serializer.save() == winner, (
+            'Проверьте, что при одновременной регистрации с теми же '
+            'данными возвращается уже созданный пользователь.'
+        )
+
+        serializer = UserCreateSerializer(data={
+            'username': 'racer2', 'email': 'racer2@x.fake'
+        })
+        assert serializer.is_valid()
+        django_user_model.objects.create(
+            username='racer2', email='other@x.fake'
+        )
+        with pytest.raises(ValidationError):
+            serializer.save()
@@ -0,0 +1,63 @@
+import pytest
+
+from tests.utils import count_queries
+from users.cache import cache_user, get_cached_user, invalidate_user
+from users.models import User
+
+
+@pytest.fixture
+def shared_cache(settings):
+    # Тесты идут в одном процессе, поэтому и locmem для них общий кеш.
+    settings.AUTH_USER_CACHE = True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20AuthCache:
+
+    def test_01_cached_user(self, shared_cache, user_client):
+        user_client.get('/api/v1/users/me/')
+        assert count_queries(user_client, '/api/v1/users/me/') == 0, (
+            'Проверьте, что аутентифицированный пользователь берётся '
+            'из кеша.'
+        )
+
+    def test_02_role_change(self, shared_cache, admin_client, user_client,
+                            user):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что новая роль пользователя учитывается сразу '
+            'после изменения.'
+        )
+
+    def test_03_deleted_user(self, shared_cache, admin_client, user_client,
+                             user):
+        user_client.get('/api/v1/users/me/')
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что удалённый пользователь не аутентифицируется '
+            'из кеша.'
+        )
+
+    def test_04_stale_write_ignored(self, shared_cache, user):
+        cached, generation = get_cached_user(user.pk)
+        assert cached is None
+        invalidate_user(user.pk)
+        cache_user(user, generation)
+        assert get_cached_user(user.pk)[0] is None, (
+            'Проверьте, что пользователь, прочитанный до изменения, '
+            'не попадает в кеш после него.'
+        )
+
+    def test_05_process_local_cache(self, settings, user_client, user):
+        settings.AUTH_USER_CACHE = False
+        assert user_client.get('/api/v1/users/').status_code == 403
+        # Изменение в другом процессе меняет поколение только в его
+        # собственном кеше.
+        User.objects.filter(pk=user.pk).update(role='admin')
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что без общего кеша пользователь читается из базы.'
+        )
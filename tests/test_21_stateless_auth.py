@@ -0,0 +1,78 @@
+import pytest
+from rest_framework.test import APIClient
+
+from tests.utils import count_queries
+from users.tokens import ClaimsAccessToken
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.fixture
+def stateless(settings):
+    # Тесты идут в одном процессе, поэтому и locmem для них общий кеш.
+    settings.AUTH_USER_CACHE = True
+    settings.AUTH_STATELESS = True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21StatelessAuth:
+
+    def test_01_no_user_queries(self, stateless, admin):
+        client = claims_client(admin)
+        client.get('/api/v1/categories/')
+        assert count_queries(client, '/api/v1/categories/') == 0, (
+            'Проверьте, что в режиме AUTH_STATELESS пользователь '
+            'собирается из токена без запросов к базе.'
+        )
+        response = client.post(
+            '/api/v1/categories/', data={'name': 'Кино', 'slug': 'kino'}
+        )
+        assert response.status_code == 201
+
+    def test_02_me_reads_database(self, stateless, user):
+        response = claims_client(user).get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что `/users/me/` возвращает данные пользователя '
+            'из базы, а не из токена.'
+        )
+
+    def test_03_role_change(self, stateless, admin_client, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        token_version = user.token_version
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        user.refresh_from_db()
+        assert user.token_version == token_version + 1, (
+            'Проверьте, что смена роли увеличивает версию прав.'
+        )
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что после смены роли старый токен не даёт '
+            'прежних прав.'
+        )
+
+        user.bio = 'Без изменения прав'
+        user.save()
+        assert user.token_version == token_version + 1
+        user.role = 'moderator'
+        user.save()
+        assert user.token_version == token_version + 2
+
+    def test_04_deleted_user(self, stateless, admin_client, user):
+        client = claims_client(user)
+        client.get('/api/v1/categories/')
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert client.get('/api/v1/categories/').status_code == 401
+
+    def test_05_token_claims(self, user):
+        token = ClaimsAccessToken.for_user(user)
+        assert token['role'] == user.role
+        assert token['ver'] == user.token_version
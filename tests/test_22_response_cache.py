@@ -0,0 +1,113 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Title
+from tests.utils import count_queries
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Звезда', year=1990, category=category)
+    title.genre.set([genre])
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ResponseCache:
+
+    def test_01_cached_lists(self, title):
+        client = APIClient()
+        for url in (
+            '/api/v1/titles/', '/api/v1/categories/', '/api/v1/genres/'
+        ):
+            assert client.get(url)['X-Cache'] == 'MISS'
+            assert count_queries(client, url) == 0, (
+                f'Проверьте, что повторный GET-запрос к `{url}` '
+                'берётся из кеша без запросов к базе.'
+            )
+            assert client.get(url)['X-Cache'] == 'HIT'
+
+    def test_02_query_order(self, title):
+        client = APIClient()
+        client.get('/api/v1/titles/?year=1990&genre=drama')
+        response = client.get('/api/v1/titles/?genre=drama&year=1990')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров запроса не влияет '
+            'на ключ кеша.'
+        )
+        assert response.json()['count'] == 1
+        assert client.get('/api/v1/titles/?year=1991').json()['count'] == 0
+
+    def test_03_title_changes(self, admin_client, user_client, title):
+        client = APIClient()
+        client.get('/api/v1/titles/')
+        admin_client.patch(
+            f'/api/v1/titles/{title.id}/', data={'name': 'Новая звезда'}
+        )
+        result = client.get('/api/v1/titles/').json()['results'][0]
+        assert result['name'] == 'Новая звезда', (
+            'Проверьте, что изменение произведения сбрасывает кеш списка.'
+        )
+
+        Genre.objects.create(name='Комедия', slug='comedy')
+        admin_client.patch(
+            f'/api/v1/titles/{title.id}/', data={'genre': ['comedy']},
+            format='json'
+        )
+        result = client.get('/api/v1/titles/').json()['results'][0]
+        assert [genre['slug'] for genre in result['genre']] == ['comedy'], (
+            'Проверьте, что изменение жанров произведения сбрасывает '
+            'кеш списка.'
+        )
+
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        result = client.get('/api/v1/titles/').json()['results'][0]
+        assert result['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кеш списка произведений.'
+        )
+
+    def test_04_category_changes(self, admin_client, title):
+        client = APIClient()
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/titles/')
+        title.category.name = 'Кино'
+        title.category.save()
+        assert client.get('/api/v1/categories/').json()['results'][0][
+            'name'
+        ] == 'Кино'
+        assert client.get('/api/v1/titles/').json()['results'][0][
+            'category'
+        ]['name'] == 'Кино', (
+            'Проверьте, что изменение категории сбрасывает кеш списка '
+            'произведений.'
+        )
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert client.get('/api/v1/categories/').json()['count'] == 2
+        admin_client.delete('/api/v1/genres/drama/')
+        assert client.get('/api/v1/genres/').json()['count'] == 0
+
+    def test_05_absolute_links(self):
+        Category.objects.bulk_create(
+            Category(name=f'Фильм {number}', slug=f'films{number}')
+            for number in range(11)
+        )
+        client = APIClient()
+        client.get('/api/v1/categories/', HTTP_HOST='first.example')
+        response = client.get(
+            '/api/v1/categories/', HTTP_HOST='second.example', secure=True
+        )
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['next'].startswith(
+            'https://second.example/'
+        ), (
+            'Проверьте, что ответы с абсолютными ссылками пагинации '
+            'кешируются отдельно для каждого хоста и схемы.'
+        )
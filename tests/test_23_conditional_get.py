@@ -0,0 +1,133 @@
+import io
+import shutil
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from tests.test_15_dataset import DATA_PATH
+
+
+@pytest.fixture
+def review(user):
+    category = Category.objects.create(name='Фильм', slug='films')
+    title = Title.objects.create(name='Звезда', year=1990, category=category)
+    return Review.objects.create(
+        author=user, title=title, text='Отзыв', score=5
+    )
+
+
+def revalidate(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ConditionalGet:
+
+    def test_01_not_modified(self, review):
+        client = APIClient()
+        title_url = f'/api/v1/titles/{review.title_id}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        for url in (
+            title_url, reviews_url, f'{reviews_url}{review.id}/',
+            comments_url, '/api/v1/titles/', '/api/v1/categories/',
+        ):
+            response = revalidate(client, url)
+            assert response.status_code == 304, (
+                f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+                '`If-None-Match` возвращает 304.'
+            )
+            assert not response.content
+
+        last_modified = client.get(title_url)['Last-Modified']
+        response = client.get(
+            title_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == 304, (
+            'Проверьте, что запрос с `If-Modified-Since` не раньше даты '
+            'изменения произведения возвращает 304.'
+        )
+
+    def test_02_title_changes(self, admin_client, user_client, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/'
+        etag = client.get(url)['ETag']
+        user_client.patch(
+            f'{url}reviews/{review.id}/', data={'score': 9}
+        )
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что изменение рейтинга меняет ETag произведения.'
+        )
+
+        etag = client.get(url)['ETag']
+        Genre.objects.create(name='Драма', slug='drama')
+        admin_client.patch(url, data={'genre': ['drama']}, format='json')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что изменение жанров меняет ETag произведения.'
+        )
+
+        etag = client.get(url)['ETag']
+        category = Category.objects.get(slug='films')
+        category.name = 'Кино'
+        category.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что переименование категории меняет ETag '
+            'произведения.'
+        )
+
+    def test_03_comment_changes(self, user_client, review):
+        client = APIClient()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etags = {
+            url: client.get(url)['ETag'],
+            f'{url}{review.id}/': client.get(f'{url}{review.id}/')['ETag'],
+        }
+        response = user_client.post(
+            f'{url}{review.id}/comments/', data={'text': 'Комментарий'}
+        )
+        for changed_url, etag in etags.items():
+            assert client.get(
+                changed_url, HTTP_IF_NONE_MATCH=etag
+            ).status_code == 200, (
+                'Проверьте, что новый комментарий меняет ETag '
+                f'`{changed_url}`.'
+            )
+
+        comment_url = f'{url}{review.id}/comments/{response.json()["id"]}/'
+        etag = client.get(url)['ETag']
+        user_client.delete(comment_url)
+        assert not Comment.objects.exists()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что удаление комментария меняет ETag списка отзывов.'
+        )
+
+    def test_04_incremental_import(self, tmp_path):
+        data_path = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data_path)
+        call_command('import_csv', path=str(data_path), workers=1)
+        client = APIClient()
+        url = '/api/v1/titles/1/'
+        for filename, old, new in (
+            ('genre.csv', '1,Драма,drama', '1,Драматургия,drama'),
+            ('category.csv', '1,Фильм,movie', '1,Кинофильм,movie'),
+            ('genre_title.csv', '\n1,1,1', '\n1,1,2'),
+        ):
+            etag = client.get(url)['ETag']
+            csv_file = data_path / filename
+            csv_file.write_text(
+                csv_file.read_text(encoding='utf-8').replace(old, new, 1),
+                encoding='utf-8'
+            )
+            call_command(
+                'import_csv', path=str(data_path), workers=1,
+                incremental=True, stdout=io.StringIO()
+            )
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                f'Проверьте, что изменение `{filename}` при '
+                '`import_csv --incremental` меняет ETag произведения.'
+            )
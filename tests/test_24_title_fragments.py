@@ -0,0 +1,159 @@
+import io
+import shutil
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Title
+from tests.test_15_dataset import DATA_PATH
+from tests.utils import count_queries
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    titles = []
+    for number in range(3):
+        title = Title.objects.create(
+            name=f'Звезда {number}', year=1990, category=category
+        )
+        title.genre.set([genre])
+        titles.append(title)
+    return titles
+
+
+def first_result(client, url):
+    return client.get(url).json()['results'][0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleFragments:
+
+    def test_01_fragments_reused(self, titles):
+        client = APIClient()
+        client.get('/api/v1/titles/')
+        assert count_queries(client, '/api/v1/titles/?year=1990') == 2, (
+            'Проверьте, что список произведений собирается из '
+            'закешированных представлений: нужны только подсчёт и '
+            'выборка страницы.'
+        )
+        response = client.get('/api/v1/titles/?page=1').json()
+        assert [title['id'] for title in response['results']] == [
+            title.id for title in titles
+        ]
+        assert response['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+
+    def test_02_fragments_invalidated(self, admin_client, user_client,
+                                      titles):
+        client = APIClient()
+        url = '/api/v1/titles/'
+        client.get(url)
+        user_client.post(
+            f'{url}{titles[0].id}/reviews/', data={'text': 'Отзыв', 'score': 8}
+        )
+        assert first_result(client, url)['rating'] == 8, (
+            'Проверьте, что новый отзыв обновляет представление '
+            'произведения в списке.'
+        )
+
+        Genre.objects.create(name='Комедия', slug='comedy')
+        admin_client.patch(
+            f'{url}{titles[0].id}/', data={'genre': ['comedy']},
+            format='json'
+        )
+        assert first_result(client, url)['genre'][0]['slug'] == 'comedy', (
+            'Проверьте, что изменение жанров обновляет представление '
+            'произведения в списке.'
+        )
+
+        genre = Genre.objects.get(slug='comedy')
+        genre.name = 'Комедия положений'
+        genre.save()
+        assert first_result(client, url)['genre'][0]['name'] == (
+            'Комедия положений'
+        ), (
+            'Проверьте, что переименование жанра обновляет представление '
+            'произведения в списке.'
+        )
+
+        category = Category.objects.get(slug='films')
+        category.name = 'Кино'
+        category.save()
+        assert first_result(client, url)['category']['name'] == 'Кино', (
+            'Проверьте, что переименование категории обновляет '
+            'представление произведения в списке.'
+        )
+
+    def test_03_incremental_import(self, tmp_path):
+        data_path = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data_path)
+        call_command('import_csv', path=str(data_path), workers=1)
+        client = APIClient()
+        url = '/api/v1/titles/'
+        assert first_result(client, url)['genre'][0]['name'] == 'Драма'
+
+        for filename, old, new in (
+            ('genre.csv', '1,Драма,drama', '1,Драматургия,drama'),
+            ('category.csv', '1,Фильм,movie', '1,Кинофильм,movie'),
+            ('genre_title.csv', '\n1,1,1', '\n1,1,2'),
+        ):
+            csv_file = data_path / filename
+            csv_file.write_text(
+                csv_file.read_text(encoding='utf-8').replace(old, new, 1),
+                encoding='utf-8'
+            )
+            call_command(
+                'import_csv', path=str(data_path), workers=1,
+                incremental=True, stdout=io.StringIO()
+            )
+        title = first_result(client, url)
+        assert title['category']['name'] == 'Кинофильм', (
+            'Проверьте, что `import_csv --incremental` обновляет '
+            'представления произведений при изменении категории.'
+        )
+        assert title['genre'][0]['slug'] == 'comedy', (
+            'Проверьте, что `import_csv --incremental` обновляет '
+            'представления произведений при изменении их жанров.'
+        )
+        second = client.get(url).json()['results'][1]
+        assert second['genre'][0]['name'] == 'Драматургия', (
+            'Проверьте, что `import_csv --incremental` обновляет '
+            'представления произведений при переименовании жанра.'
+        )
+
+    def test_04_admin_genres(self, client, django_user_model, titles):
+        client.force_login(django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567'
+        ))
+        title = titles[0]
+        url = f'/admin/reviews/title/{title.id}/change/'
+        form = client.get(url).content.decode()
+        assert 'genretitle_set-TOTAL_FORMS' in form, (
+            'Проверьте, что жанры произведения можно редактировать '
+            'в админке.'
+        )
+        api_client = APIClient()
+        api_client.get('/api/v1/titles/')
+        link = title.genretitle_set.get()
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        response = client.post(url, {
+            'name': title.name, 'year': title.year,
+            'category': title.category_id, 'description': '',
+            'genretitle_set-TOTAL_FORMS': 2,
+            'genretitle_set-INITIAL_FORMS': 1,
+            'genretitle_set-0-id': link.id,
+            'genretitle_set-0-title': title.id,
+            'genretitle_set-0-genre': link.genre_id,
+            'genretitle_set-1-title': title.id,
+            'genretitle_set-1-genre': comedy.id,
+        })
+        assert response.status_code == 302, response.content.decode()
+        genres = first_result(api_client, '/api/v1/titles/')['genre']
+        assert [genre['slug'] for genre in genres] == ['drama', 'comedy'], (
+            'Проверьте, что жанры, изменённые в админке, сразу видны '
+            'в списке произведений.'
+        )
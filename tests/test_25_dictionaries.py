@@ -0,0 +1,132 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.serializers import TitleSerializer
+from api_yamdb.settings import DICTIONARY_MAX_AGE
+from reviews.dictionaries import category_dictionary, genre_dictionary
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    title = Title.objects.create(name='Звезда', year=1990, category=category)
+    # set() добавляет связи в порядке множества id, а вывод жанров
+    # идёт в порядке связей.
+    for genre in genres:
+        title.genre.add(genre)
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Dictionaries:
+
+    def test_01_write_validation(self, title):
+        genre_dictionary.get()
+        category_dictionary.get()
+        serializer = TitleSerializer(data={
+            'name': 'Новая звезда', 'year': 2000, 'category': 'films',
+            'genre': ['drama', 'comedy'],
+        })
+        with CaptureQueriesContext(connection) as queries:
+            assert serializer.is_valid(), serializer.errors
+        assert not queries, (
+            'Проверьте, что слаги жанров и категории проверяются по '
+            'словарю без запросов к базе.'
+        )
+        assert [
+            genre.id for genre in serializer.validated_data['genre']
+        ] == title.genre_ids
+
+        serializer = TitleSerializer(data={
+            'name': 'Новая звезда', 'year': 2000, 'category': 'films',
+            'genre': ['drama', 'unknown'],
+        })
+        assert not serializer.is_valid()
+        assert 'genre' in serializer.errors
+
+    def test_02_read_without_tables(self, title):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as queries:
+            data = client.get(f'/api/v1/titles/{title.id}/').json()
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert data['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
+        for table in ('"reviews_genre"', '"reviews_category"'):
+            assert not any(
+                table in query['sql'] for query in queries
+            ), (
+                'Проверьте, что жанры и категория произведения выводятся '
+                'из словаря без чтения их таблиц.'
+            )
+        response = client.get('/api/v1/titles/?genre=comedy&category=films')
+        assert response.json()['count'] == 1
+        response = client.get('/api/v1/titles/?genre=unknown')
+        assert response.json()['count'] == 0
+
+    def test_03_refresh_on_create_and_delete(self, admin_client, title):
+        data = {
+            'name': 'Новая звезда', 'year': 2000, 'category': 'books',
+            'genre': ['drama'],
+        }
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 400
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что новая категория сразу попадает в словарь.'
+        )
+
+        admin_client.delete('/api/v1/genres/drama/')
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 400, (
+            'Проверьте, что удалённый жанр сразу исчезает из словаря.'
+        )
+        assert 'genre' in response.json()
+
+    def test_04_changes_from_other_process(self, monkeypatch, title):
+        genre_dictionary.get()
+        category_dictionary.get()
+        # Записи без сигналов: так выглядят изменения, версии которых
+        # другой процесс поменял только в своём кеше.
+        Genre.objects.bulk_create([Genre(name='Триллер', slug='thriller')])
+        serializer = TitleSerializer(data={
+            'name': 'Новая звезда', 'year': 2000, 'category': 'films',
+            'genre': ['thriller'],
+        })
+        assert serializer.is_valid(), (
+            'Проверьте, что слаг, которого нет в словаре, проверяется '
+            'по базе.'
+        )
+        response = APIClient().get('/api/v1/titles/?genre=thriller')
+        assert response.status_code == 200
+        with CaptureQueriesContext(connection) as queries:
+            TitleSerializer(data={
+                'name': 'Новая звезда', 'year': 2000, 'category': 'films',
+                'genre': ['unknown'],
+            }).is_valid()
+        assert len(queries) == 1
+
+        category_dictionary.get()
+        Category.objects.filter(slug='films').update(name='Кино')
+        monkeypatch.setattr('reviews.dictionaries.time', SimpleNamespace(
+            monotonic=lambda: time.monotonic() + DICTIONARY_MAX_AGE
+        ))
+        data = APIClient().get(f'/api/v1/titles/{title.id}/').json()
+        assert data['category']['name'] == 'Кино', (
+            'Проверьте, что словарь перечитывается не реже '
+            'DICTIONARY_MAX_AGE.'
+        )
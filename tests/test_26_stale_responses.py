@@ -0,0 +1,125 @@
+import pytest
+from django.core.cache import cache
+from django.db import OperationalError
+from rest_framework import mixins
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.authentication import CachedJWTAuthentication
+from api.cache import stale_response_key
+from reviews.models import Category
+
+URL = '/api/v1/categories/'
+
+
+@pytest.fixture
+def stale_mode(settings):
+    settings.RESPONSE_STALE_WHILE_REVALIDATE = True
+    settings.RESPONSE_STALE_MAX_AGE = 60
+
+
+@pytest.fixture
+def locked_database(monkeypatch):
+    """Список категорий падает с `database is locked`, пока locked."""
+    state = {'locked': False, 'refreshes': []}
+    original_list = mixins.ListModelMixin.list
+
+    def list_or_fail(self, request, *args, **kwargs):
+        if state['locked']:
+            raise OperationalError('database is locked')
+        return original_list(self, request, *args, **kwargs)
+
+    original_get_user = CachedJWTAuthentication.get_user
+
+    def get_user_or_fail(self, validated_token):
+        if state['locked']:
+            raise OperationalError('database is locked')
+        return original_get_user(self, validated_token)
+
+    monkeypatch.setattr(mixins.ListModelMixin, 'list', list_or_fail)
+    monkeypatch.setattr(CachedJWTAuthentication, 'get_user', get_user_or_fail)
+    monkeypatch.setattr(
+        'api.mixins.run_in_background', state['refreshes'].append
+    )
+    return state
+
+
+def add_category():
+    Category.objects.create(
+        name='Книги', slug=f'books{Category.objects.count()}'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26StaleResponses:
+
+    def test_01_stale_while_locked(self, stale_mode, locked_database):
+        client = APIClient()
+        Category.objects.create(name='Фильм', slug='films')
+        etag = client.get(URL)['ETag']
+        add_category()
+        locked_database['locked'] = True
+        response = client.get(URL)
+        assert response.status_code == 200, (
+            'Проверьте, что при занятой базе отдаётся последний ответ.'
+        )
+        assert response['X-Cache'] == 'STALE'
+        assert response['ETag'] == etag
+        assert 'Age' in response
+        assert response.json()['count'] == 1
+        assert client.get(URL)['X-Cache'] == 'STALE'
+        assert len(locked_database['refreshes']) == 1, (
+            'Проверьте, что ответ пересчитывается в фоне одним потоком.'
+        )
+
+        locked_database['locked'] = False
+        locked_database['refreshes'][0]()
+        response = client.get(URL)
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что фоновый пересчёт сохраняет новый ответ.'
+        )
+        assert response.json()['count'] == 2
+
+    def test_02_stale_while_refreshing(self, stale_mode):
+        client = APIClient()
+        client.get(URL)
+        add_category()
+        request = Request(APIRequestFactory().get(URL))
+        cache.set(f'{stale_response_key(request, "categories")}:refresh', 1)
+        response = client.get(URL)
+        assert response['X-Cache'] == 'STALE', (
+            'Проверьте, что пока ответ пересчитывается другим запросом, '
+            'отдаётся последний ответ.'
+        )
+        assert response.json()['count'] == 0
+
+    def test_03_staleness_bound(self, settings, stale_mode, locked_database):
+        client = APIClient()
+        client.get(URL)
+        add_category()
+        settings.RESPONSE_STALE_MAX_AGE = 0
+        locked_database['locked'] = True
+        with pytest.raises(OperationalError):
+            client.get(URL)
+
+    def test_04_disabled(self, locked_database):
+        client = APIClient()
+        client.get(URL)
+        add_category()
+        locked_database['locked'] = True
+        with pytest.raises(OperationalError):
+            client.get(URL)
+
+    def test_05_authenticated_while_locked(self, stale_mode, locked_database,
+                                           user_client):
+        user_client.get(URL)
+        add_category()
+        locked_database['locked'] = True
+        response = user_client.get(URL)
+        assert response.status_code == 200, (
+            'Проверьте, что при занятой базе последний ответ отдаётся и '
+            'аутентифицированному пользователю.'
+        )
+        assert response['X-Cache'] == 'STALE'
+        with pytest.raises(OperationalError):
+            user_client.get('/api/v1/users/me/')